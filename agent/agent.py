@@ -1,33 +1,94 @@
 """
-Core AI agent implementation using OpenAI GPT-5.2 with function calling.
+Core AI agent implementation using OpenAI models with function calling.
 
 EquipmentBookingAgent follows the ReAct pattern: it calls tools, observes
-their results, and produces a final natural-language response.  Today's date
-is injected dynamically into the system prompt on every turn so the model
-can resolve relative dates correctly.
+their results, and produces a final natural-language response.  It talks to
+the Responses API and chains turns with previous_response_id, so OpenAI
+holds the conversation and each request only carries the new items.
+
+Today's date is injected dynamically into the instructions on every turn so
+the model can resolve relative dates correctly.  The static prompt leads the
+instructions so OpenAI's prompt cache can reuse it across turns and sessions.
 
 Sessions require username-based login before the normal chat loop begins.
+Replies are streamed from OpenAI and exposed through stream_chat(); chat()
+collects the same stream into one string.  Blocking database work is pushed
+to worker threads so the event loop stays free while requests are in flight.
+Turns run on the fast config.OPENAI_MODEL and escalate to the larger
+config.OPENAI_ESCALATION_MODEL for long messages or when the fast model
+returns nothing.  Self-contained read-only lookups can be answered from a
+semantic cache (agent/semantic_cache.py) without calling the model.  Long
+sessions are summarized in the background (see ConversationMemory.compact).
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import re
+import time
+import unicodedata
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from openai import OpenAI
+import httpx
+import orjson
+from openai import APIStatusError, AsyncOpenAI
 
 import config
 from agent.memory import ConversationMemory, memory as global_memory
-from agent.prompts import SYSTEM_PROMPT
+from agent.prompts import (
+    CLARIFY_REPLY,
+    DUPLICATE_REPLY,
+    EQUIPMENT_LIST_FOOTER,
+    GREETING_REPLY,
+    HELP_TEXT,
+    SUMMARY_PROMPT,
+    SYSTEM_PROMPT_PREFIX,
+    THANKS_REPLY,
+)
+from agent.semantic_cache import (
+    EMBEDDING_MODEL,
+    READ_ONLY_TOOLS,
+    SemanticCache,
+    is_read_only,
+    names_slot,
+    normalize,
+    semantic_cache as global_semantic_cache,
+)
 from agent.tool_executor import ToolExecutor
-from agent.tools import TOOLS
-from core.booking_engine import lookup_user
+from agent.tools import RESPONSES_TOOLS
+from core.booking_engine import (
+    get_equipment_version,
+    get_write_generation,
+    list_equipment,
+    lookup_user,
+)
 
 
 logger = logging.getLogger(__name__)
 
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Messages answered directly, without a model call.  Patterns match the whole
+# message so anything with more content still goes to the model.
+_GREETING = re.compile(
+    r"^(hi+|hello|hey|good (morning|afternoon|evening))[\s!.]*$", re.IGNORECASE,
+)
+_THANKS = re.compile(
+    r"^(thanks|thank you|thank u|thx|ty)( (so|very) much)?[\s!.]*$", re.IGNORECASE,
+)
+_HELP = re.compile(r"^(/?start|/?help|what can you do)[\s!?.]*$", re.IGNORECASE)
+_LIST_EQUIPMENT = re.compile(
+    r"^(what equipment do you have|(list|show)( me)?( all)?( the)? equipment)[\s!?.]*$",
+    re.IGNORECASE,
+)
+
+# A message identical to one still being answered for the session, received
+# within this many seconds of it, is treated as an accidental double-send.
+_RESEND_WINDOW_SECONDS = 10.0
+
 
 class EquipmentBookingAgent:
     """
@@ -35,23 +96,61 @@ class EquipmentBookingAgent:
     """
 
     def __init__(self) -> None:
-        """Initialise the OpenAI client, memory store, and tool executor."""
+        """Initialise the memory store, tool executor, and client registry."""
 
-        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        self._clients: Dict[asyncio.AbstractEventLoop, AsyncOpenAI] = {}
+        self._compacting: set[str] = set()
+        self._background_tasks: set[asyncio.Task] = set()
         self.memory: ConversationMemory = global_memory
+        self.cache: SemanticCache = global_semantic_cache
         self.tool_executor = ToolExecutor()
-        self.model = "gpt-5.2"
+        self.model = config.OPENAI_MODEL
+        self.escalation_model = config.OPENAI_ESCALATION_MODEL
+        # Messages longer than this go straight to the escalation model.
+        self.escalation_message_chars = 400
+        # Caps time-to-last-token; lifted for booking confirmations and when
+        # escalating.  Reasoning tokens count toward it, hence not lower.
+        self.max_output_tokens = 1024
         self.max_tool_iterations = 10
 
-    def _build_system_message(self, session_id: str) -> Dict[str, Any]:
+    @property
+    def client(self) -> AsyncOpenAI:
         """
-        Build the system message with today's date and user context injected.
+        Return the AsyncOpenAI client bound to the running event loop.
+
+        An async HTTP connection pool must not be shared between event
+        loops, so one client is kept per loop: bound by the web server's
+        lifespan, or created lazily on first use.  Each uses HTTP/2 so the
+        requests of a tool loop are multiplexed over one kept-alive
+        connection instead of reopening it.
+        """
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = create_client()
+            self._clients[loop] = client
+        return client
+
+    def bind_client(self, client: AsyncOpenAI) -> None:
+        """Use an externally managed client for calls on the running event loop."""
+
+        self._clients[asyncio.get_running_loop()] = client
+
+    def unbind_client(self) -> None:
+        """Forget the client bound to the running event loop (its owner closes it)."""
+
+        self._clients.pop(asyncio.get_running_loop(), None)
+
+    def _build_instructions(self, session_id: str, equipment_pack: str) -> str:
         """
+        Build the instructions with inventory, date and user context injected.
 
-        IST = timezone(timedelta(hours=5, minutes=30))
-        now = datetime.now(IST)
-        date_str = now.strftime("%A, %d %B %Y")
-        time_str = now.strftime("%I:%M %p").lstrip("0") + " IST"
+        Ordered from most to least shared so the cacheable prefix is as long
+        as possible: static prompt, equipment pack (changes on writes), user
+        context (per session), then the volatile date line.  The time is
+        rounded down to the hour so it only changes once an hour.
+        """
 
         user_ctx = self.memory.get_user_context(session_id)
         user_info_block = ""
@@ -72,30 +171,80 @@ class EquipmentBookingAgent:
                     f"\nThey can view all active bookings but can only view history for {club}."
                 )
 
-        return {
-            "role": "system",
-            "content": (
-                SYSTEM_PROMPT
-                + f"\n\nCurrent date: {date_str}"
-                + f"\nCurrent time: {time_str}"
-                + user_info_block
-                + "\n\nIMPORTANT: Always call the appropriate tool (list_equipment, "
-                  "get_bookings, get_active_bookings, check_availability) when the user "
-                  "asks about equipment, bookings, or availability — NEVER answer from "
-                  "conversation history as data changes with every booking, cancellation, "
-                  "and return."
-            ),
-        }
+        return _compose_instructions(int(time.time()) // 60, equipment_pack, user_info_block)
+
+    async def _embed(self, text: str) -> Optional[List[float]]:
+        """Return the embedding of text, or None if the request fails."""
+
+        try:
+            response = await self.client.embeddings.create(
+                model=EMBEDDING_MODEL, input=text,
+            )
+        except Exception:
+            logger.warning("Embedding request failed; skipping semantic cache", exc_info=True)
+            return None
+        return response.data[0].embedding
+
+    # ── History compaction ─────────────────────────────────────────────────
+
+    def _schedule_compaction(self, session_id: str) -> None:
+        """Summarize older history in the background once a session is long."""
+
+        cut = self.memory.compaction_cut(session_id)
+        if not cut or session_id in self._compacting:
+            return
+        self._compacting.add(session_id)
+        task = asyncio.create_task(self._compact(session_id, cut))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _compact(self, session_id: str, cut: int) -> None:
+        """Fold the first `cut` history items into a single summary message."""
+
+        try:
+            older = self.memory.get_history(session_id, stop=cut)
+            response = await self.client.responses.create(
+                model=self.model,
+                instructions=SUMMARY_PROMPT,
+                input=_render_transcript(older),
+                store=False,
+            )
+            summary = response.output_text.strip()
+            if summary:
+                self.memory.compact(session_id, cut, older[0], summary)
+        except Exception:
+            logger.warning("History compaction failed for %s", session_id, exc_info=True)
+        finally:
+            self._compacting.discard(session_id)
+
+    async def _direct_reply(self, user_message: str) -> Optional[str]:
+        """Return a reply for messages that do not need the model, else None."""
+
+        text = user_message.strip()
+        if _HELP.match(text):
+            return HELP_TEXT
+        if _GREETING.match(text):
+            return GREETING_REPLY
+        if _THANKS.match(text):
+            return THANKS_REPLY
+        if _LIST_EQUIPMENT.match(text):
+            listing = await asyncio.to_thread(list_equipment)
+            return f"{listing}\n\n{EQUIPMENT_LIST_FOOTER}"
+        return None
+
+    def _finish_turn(self, session_id: str, user_message: str, reply: str) -> None:
+        """Record a successful reply and schedule compaction if needed."""
+
+        self.memory.add_message(session_id, "assistant", reply)
+        self._schedule_compaction(session_id)
 
     # ── Login flow ─────────────────────────────────────────────────────────
 
-    def _handle_login(self, session_id: str, user_message: str) -> str:
+    async def _handle_login(self, session_id: str, user_message: str) -> str:
         """Handle the login flow before normal chat begins."""
 
-        history = self.memory.get_history(session_id)
-
         # First message in this session — greet and ask for username
-        if len(history) == 0:
+        if self.memory.message_count(session_id) == 0:
             greeting = (
                 "👋 Welcome to Gear Genix!\n"
                 "I need to verify your identity first.\n"
@@ -107,7 +256,7 @@ class EquipmentBookingAgent:
 
         # Subsequent messages — treat as username attempt
         username = user_message.strip()
-        user_info = lookup_user(username)
+        user_info = await asyncio.to_thread(lookup_user, username)
 
         if user_info is None:
             error_msg = (
@@ -145,108 +294,321 @@ class EquipmentBookingAgent:
 
     # ── Main chat loop ─────────────────────────────────────────────────────
 
-    def chat(self, session_id: str, user_message: str) -> str:
+    async def chat(self, session_id: str, user_message: str) -> str:
         """
         Process a user message and return the agent's natural-language reply.
 
+        Convenience wrapper that drains stream_chat() into a single string.
+        """
+
+        parts = [token async for token in self.stream_chat(session_id, user_message)]
+        return "".join(parts)
+
+    async def stream_chat(self, session_id: str, user_message: str) -> AsyncIterator[str]:
+        """
+        Process a user message and yield the reply as it is generated.
+
         Implements login gate + full ReAct loop:
         1. If not logged in, handle login flow.
-        2. Add user message to memory.
-        3. Build message list (fresh system prompt + history).
-        4. Call OpenAI API.
-        5. If finish_reason == 'tool_calls': execute tools, add results, repeat.
-        6. If finish_reason == 'stop': return the assistant's text.
+        2. Answer double-sends, greetings, help and plain equipment
+           listings directly; otherwise add the user message to memory.
+        3. Send the items OpenAI has not seen yet, chained to the session's
+           previous response (or the full history if there is no chain).
+        4. Stream the response, yielding text deltas as they arrive.
+        5. If the response contains function calls: execute tools, add
+           results, repeat.
+        6. Otherwise record the assistant's text and finish.
         """
 
         if not user_message:
-            return "Please send a message so I can help you."
+            yield "Please send a message so I can help you."
+            return
 
         # Login gate
         if not self.memory.is_logged_in(session_id):
-            return self._handle_login(session_id, user_message)
+            yield await self._handle_login(session_id, user_message)
+            return
+
+        # ── Short-circuits ─────────────────────────────────────────────────
+        # Punctuation-only messages carry nothing to act on.  Emoji are
+        # symbols, not punctuation, and still reach the model ("👍" = yes).
+        if all(unicodedata.category(ch)[0] in "PZ" for ch in user_message):
+            yield CLARIFY_REPLY
+            return
+
+        # Stamped on receipt, so a copy sent while the first is still being
+        # answered is caught; a later deliberate repeat ("yes") is not.
+        stamp = self.memory.begin_turn(session_id, user_message, _RESEND_WINDOW_SECONDS)
+        if stamp is None:
+            yield DUPLICATE_REPLY
+            return
+
+        try:
+            async for token in self._run_turn(session_id, user_message):
+                yield token
+        finally:
+            self.memory.end_turn(session_id, stamp)
+
+    async def _run_turn(self, session_id: str, user_message: str) -> AsyncIterator[str]:
+        """Answer a logged-in user's message (steps 2-6 of stream_chat)."""
 
         self.memory.add_message(session_id, "user", user_message)
 
+        direct = await self._direct_reply(user_message)
+        if direct is not None:
+            self._finish_turn(session_id, user_message, direct)
+            yield direct
+            return
+
         user_ctx = self.memory.get_user_context(session_id)
+        # Built once per turn so every tool-loop request sends identical
+        # instructions, even if the hour rolls over mid-turn.
+        equipment_pack, data_version = await asyncio.to_thread(get_equipment_version)
+        instructions = self._build_instructions(session_id, equipment_pack)
+
+        # ── Semantic cache (read-only lookups) ─────────────────────────────
+        # Replies depend on who is asking, the data (inventory tag plus the
+        # write generation, which moves on every booking and user change),
+        # and — for "today"/"right now" questions — the current hour.
+        cache_key = None
+        if data_version and is_read_only(user_message):
+            scope = _cache_scope(user_ctx)
+            date_str, time_str = _date_strings(int(time.time()) // 60)
+            version = f"{data_version}:{get_write_generation()}:{date_str}:{time_str}"
+            normalized = normalize(user_message)
+            embedding = None
+            cached = self.cache.get_exact(scope, version, normalized)
+            # Date/time lookups match exactly only: near-identical wording
+            # can still ask about a different slot.
+            if cached is None and not names_slot(normalized):
+                embedding = await self._embed(normalized)
+                if embedding is not None:
+                    cached = self.cache.get_similar(scope, version, embedding)
+            if cached is not None:
+                self._finish_turn(session_id, user_message, cached)
+                yield cached
+                return
+            cache_key = (scope, version, normalized, embedding)
+        tools_used: set[str] = set()
+        escalated = len(user_message) > self.escalation_message_chars
 
         for iteration in range(self.max_tool_iterations):
-            messages: List[Dict[str, Any]] = [
-                self._build_system_message(session_id)
-            ] + self.memory.get_history(session_id)
+            previous_response_id = self.memory.last_response_id(session_id)
+            content_parts: List[str] = []
+            response = None
 
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    tools=TOOLS,
+                stream = await self.client.responses.create(
+                    model=self.escalation_model if escalated else self.model,
+                    instructions=instructions,
+                    max_output_tokens=(
+                        None if escalated or "make_booking" in tools_used
+                        else self.max_output_tokens
+                    ),
+                    input=self.memory.get_pending_input(session_id),
+                    previous_response_id=previous_response_id,
+                    tools=RESPONSES_TOOLS,
                     tool_choice="auto",
+                    stream=True,
                 )
-            except Exception as exc:
+                async for event in stream:
+                    if event.type == "response.output_text.delta":
+                        content_parts.append(event.delta)
+                        yield event.delta
+                    elif event.type in ("response.completed", "response.incomplete"):
+                        response = event.response
+            except APIStatusError as exc:
+                if previous_response_id and exc.status_code in (400, 404):
+                    # The stored response is gone (expired or deleted):
+                    # start a new chain from the local transcript.
+                    logger.warning(
+                        "Previous response %s unavailable, replaying history",
+                        previous_response_id,
+                    )
+                    self.memory.reset_response_chain(session_id)
+                    continue
                 logger.exception("OpenAI API call failed")
+            except Exception:
+                logger.exception("OpenAI API call failed")
+
+            if response is None:
                 error_msg = (
                     "I'm having trouble right now. Please try again in a moment."
                 )
                 self.memory.add_message(session_id, "assistant", error_msg)
-                return error_msg
+                yield error_msg
+                return
 
-            choice = response.choices[0]
-            finish_reason = choice.finish_reason
-            message = choice.message
+            function_calls = [
+                item for item in response.output if item.type == "function_call"
+            ]
 
             # ── Final response ─────────────────────────────────────────────
-            if finish_reason == "stop":
-                reply = message.content or "I wasn't able to generate a response. Please try again."
-                self.memory.add_message(session_id, "assistant", reply)
-                return reply
+            if not function_calls:
+                reply = "".join(content_parts)
+                if not reply and not escalated:
+                    # Empty or truncated answer: retry the same input on the
+                    # larger model without the output cap.
+                    logger.info(
+                        "Escalating to %s (status=%s)", self.escalation_model, response.status,
+                    )
+                    escalated = True
+                    continue
+                if not reply:
+                    reply = "I wasn't able to generate a response. Please try again."
+                    yield reply
+                    self.memory.add_message(session_id, "assistant", reply)
+                else:
+                    # Only replies grounded in read-only tool results are
+                    # reusable; a reply with no tool call came from context.
+                    if cache_key and tools_used and tools_used <= READ_ONLY_TOOLS:
+                        self.cache.put(*cache_key, reply)
+                    self._finish_turn(session_id, user_message, reply)
+                self.memory.set_last_response_id(session_id, response.id)
+                return
 
             # ── Tool calls ─────────────────────────────────────────────────
-            if finish_reason == "tool_calls" and message.tool_calls:
-                # Record the assistant message with its tool_calls.
-                tool_calls_payload = [
+            # Keep the calls locally so the transcript can be replayed, then
+            # mark everything so far as held by the server-side chain.
+            self.memory.add_function_calls(
+                session_id,
+                [
                     {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        },
+                        "type": "function_call",
+                        "call_id": fc.call_id,
+                        "name": fc.name,
+                        "arguments": fc.arguments,
                     }
-                    for tc in message.tool_calls
-                ]
-                self.memory.add_assistant_tool_call(session_id, tool_calls_payload)
-
-                # Execute each tool and record the results.
-                for tool_call in message.tool_calls:
-                    tool_name = tool_call.function.name
-                    try:
-                        arguments = json.loads(tool_call.function.arguments or "{}")
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                    logger.info("Executing tool: %s with args: %s", tool_name, arguments)
-                    result = self.tool_executor.execute(tool_name, arguments, user_context=user_ctx)
-                    logger.info("Tool result: %s", result[:200])
-
-                    self.memory.add_tool_result(session_id, tool_call.id, result)
-
-                # Loop back to call the API again with updated history.
-                continue
-
-            # ── Unexpected finish reason ───────────────────────────────────
-            logger.warning("Unexpected finish_reason: %s", finish_reason)
-            fallback = (
-                "I received an unexpected response. Please try rephrasing your message."
+                    for fc in function_calls
+                ],
             )
-            self.memory.add_message(session_id, "assistant", fallback)
-            return fallback
+            self.memory.set_last_response_id(session_id, response.id)
+
+            # Runs of read-only calls execute concurrently; a call that
+            # changes data waits for everything emitted before it and runs
+            # on its own, so e.g. a cancel lands before the booking that
+            # reuses its slot.  Results are recorded in emitted order.
+            results: List[str] = []
+            pending = []
+            for fc in function_calls:
+                try:
+                    arguments = orjson.loads(fc.arguments) if fc.arguments else {}
+                except orjson.JSONDecodeError:
+                    arguments = {}
+
+                tools_used.add(fc.name)
+                logger.info("Executing tool: %s with args: %s", fc.name, arguments)
+                call = self.tool_executor.execute_async(fc.name, arguments, user_ctx)
+                if fc.name in READ_ONLY_TOOLS:
+                    pending.append(call)
+                    continue
+                results.extend(await asyncio.gather(*pending))
+                pending = []
+                results.append(await call)
+            results.extend(await asyncio.gather(*pending))
+
+            for fc, result in zip(function_calls, results):
+                logger.info("Tool result: %s", result[:200])
+                self.memory.add_tool_result(session_id, fc.call_id, result)
+
+            # Loop back to send the tool outputs to the model.
 
         # Exceeded max iterations.
         timeout_msg = (
             "I encountered an issue processing your request. Please try again."
         )
         self.memory.add_message(session_id, "assistant", timeout_msg)
-        return timeout_msg
+        yield timeout_msg
+
 
+def create_client(max_connections: int = 100) -> AsyncOpenAI:
+    """Create an AsyncOpenAI client on a kept-alive HTTP/2 connection pool."""
+
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=30,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections // 2,
+        ),
+    )
+    return AsyncOpenAI(api_key=config.OPENAI_API_KEY, max_retries=2, http_client=http_client)
+
+
+@lru_cache(maxsize=1)
+def _date_strings(minute_bucket: int) -> tuple[str, str]:
+    """
+    Return (date_str, time_str) in IST for a minute bucket (epoch // 60).
+
+    Memoized so the strftime work runs once per minute instead of on every
+    call; the time is rounded down to the hour.
+    """
+
+    now = datetime.fromtimestamp(minute_bucket * 60, IST)
+    date_str = now.strftime("%A, %d %B %Y")
+    time_str = now.strftime("%I:00 %p").lstrip("0") + " IST"
+    return date_str, time_str
+
+
+@lru_cache(maxsize=256)
+def _compose_instructions(minute_bucket: int, equipment_pack: str, user_info_block: str) -> str:
+    """
+    Join the instruction blocks for one minute bucket.
+
+    Sessions with the same user block (e.g. one user on Telegram and the
+    web UI, or anonymous sessions) share the result within a minute: it is
+    built once and the same string object is returned to each of them.  The
+    tool loop of a turn reuses it too.
+    """
+
+    date_str, time_str = _date_strings(minute_bucket)
+    return (
+        SYSTEM_PROMPT_PREFIX
+        + (f"\n\n{equipment_pack}" if equipment_pack else "")
+        + user_info_block
+        + f"\n\nCurrent date: {date_str}"
+        + f"\nCurrent time: {time_str} (rounded down to the hour)"
+    )
+
+
+def _render_transcript(items: List[Dict[str, Any]]) -> str:
+    """Render history items as plain text for the summarization prompt."""
+
+    lines = []
+    for item in items:
+        kind = item.get("type")
+        if kind == "function_call":
+            lines.append(f"[tool call] {item['name']}({item['arguments']})")
+        elif kind == "function_call_output":
+            lines.append(f"[tool result] {item['output']}")
+        else:
+            lines.append(f"{item['role']}: {item['content']}")
+    return "\n".join(lines)
+
+
+def _cache_scope(user_ctx: Optional[Dict[str, Any]]) -> str:
+    """
+    Return the semantic-cache scope: one per user, since replies can address
+    the user by name and depend on their club and role.
+    """
+
+    if not user_ctx:
+        return "anonymous"
+    return f"user:{user_ctx['username'].strip().lower()}"
+
+
+_agent: Optional[EquipmentBookingAgent] = None
+
+
+def get_agent() -> EquipmentBookingAgent:
+    """
+    Return the shared agent used by the API and Telegram bot.
+
+    Created on first use rather than at import, so importing this module
+    (or anything that imports it) stays cheap.
+    """
 
-# Shared singleton used by the API and Telegram bot.
-agent = EquipmentBookingAgent()
+    global _agent
+    if _agent is None:
+        _agent = EquipmentBookingAgent()
+    return _agent
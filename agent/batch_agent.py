@@ -0,0 +1,163 @@
+"""
+OpenAI Batch API client for non-interactive agent work.
+
+Daily summaries and bulk reminders can wait minutes to hours, so they go
+through the Batch API (half the price, separate rate limits) instead of the
+interactive EquipmentBookingAgent.  Requests are written to a JSONL file,
+uploaded, and submitted as one batch; results are collected later by
+polling the batch id.
+
+Run from cron, e.g.:
+    python -m agent.batch_agent daily-summary      # prints the batch id
+    python -m agent.batch_agent collect <batch_id>
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import orjson
+from openai import OpenAI
+
+import config
+from agent.agent import IST
+from agent.prompts import DAILY_SUMMARY_PROMPT
+from core.booking_engine import get_active_bookings
+
+
+BATCH_ENDPOINT = "/v1/responses"
+
+_client: Optional[OpenAI] = None
+
+
+@dataclass
+class BatchRequest:
+    """One request in a batch; custom_id is echoed back with its result."""
+
+    custom_id: str
+    instructions: str
+    input: str
+
+
+def _get_client() -> OpenAI:
+    """Return the shared synchronous client, creating it on first use."""
+
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=config.OPENAI_API_KEY)
+    return _client
+
+
+def submit_batch(requests: List[BatchRequest], model: Optional[str] = None) -> str:
+    """
+    Upload the requests as a JSONL file and start a batch.  Returns the batch id.
+    """
+
+    client = _get_client()
+    model = model or config.OPENAI_MODEL
+
+    fd, path = tempfile.mkstemp(prefix="batch_", suffix=".jsonl")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            for request in requests:
+                line = {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": model,
+                        "instructions": request.instructions,
+                        "input": request.input,
+                    },
+                }
+                fh.write(orjson.dumps(line) + b"\n")
+
+        with open(path, "rb") as fh:
+            uploaded = client.files.create(file=fh, purpose="batch")
+    finally:
+        os.remove(path)
+
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def poll_batch(batch_id: str) -> str:
+    """Return the batch status (validating, in_progress, completed, failed, ...)."""
+
+    return _get_client().batches.retrieve(batch_id).status
+
+
+def collect_results(batch_id: str) -> Dict[str, str]:
+    """
+    Return {custom_id: reply text} for a completed batch.
+
+    Returns an empty dict while the batch is still running.  Requests that
+    failed inside the batch map to an error string.
+    """
+
+    client = _get_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.status != "completed" or not batch.output_file_id:
+        return {}
+
+    results: Dict[str, str] = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        row = orjson.loads(line)
+        response = row.get("response") or {}
+        if row.get("error") or response.get("status_code") != 200:
+            results[row["custom_id"]] = f"Request failed: {row.get('error') or response}"
+            continue
+        results[row["custom_id"]] = "".join(
+            part.get("text", "")
+            for item in response["body"].get("output", [])
+            if item.get("type") == "message"
+            for part in item.get("content", [])
+            if part.get("type") == "output_text"
+        )
+    return results
+
+
+def submit_daily_summary() -> str:
+    """
+    Queue today's "who has what" summary of active bookings.  Returns the batch id.
+
+    The booking rows carry no year and the batch may run hours later, so the
+    input states the IST date the report is for.
+    """
+
+    now = datetime.now(IST)
+    return submit_batch([
+        BatchRequest(
+            custom_id=f"daily-summary-{now:%Y-%m-%d}",
+            instructions=DAILY_SUMMARY_PROMPT,
+            input=f"Report date: {now:%A, %d %B %Y}\n\n{get_active_bookings()}",
+        )
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gear Genix batch jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("daily-summary", help="submit today's active-bookings summary")
+    collect = sub.add_parser("collect", help="print the results of a batch")
+    collect.add_argument("batch_id")
+    args = parser.parse_args()
+
+    if args.command == "daily-summary":
+        print(submit_daily_summary())
+    else:
+        status = poll_batch(args.batch_id)
+        print(f"Batch {args.batch_id}: {status}")
+        for custom_id, text in collect_results(args.batch_id).items():
+            print(f"\n── {custom_id} ──\n{text}")
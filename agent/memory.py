@@ -2,17 +2,35 @@
 In-memory conversation history and user context management for the AI agent.
 
 Each session (Telegram chat or web UI client) gets its own message list
-stored in the format expected by the OpenAI Chat Completions API, plus
-an optional user context dict that tracks who is logged in.
+stored as OpenAI Responses API input items, plus an optional user context
+dict that tracks who is logged in.
+
+OpenAI also keeps the conversation server-side: the id of the last response
+is tracked per session so each turn only uploads the items added since then.
+The local transcript is the fallback used to start a fresh response chain.
+
+Long sessions are compacted: older items are folded into a single summary
+message and a new chain is started from the summary plus the recent window,
+which bounds the prompt size of every later turn.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 
 Message = Dict[str, Any]
 
+# Compact once a session holds more items than this...
+COMPACT_THRESHOLD = 24
+# ...keeping roughly this many of the most recent items verbatim.
+RECENT_WINDOW = 12
+
+SUMMARY_PREFIX = "Prior context summary: "
+
+_TOOL_ITEM_TYPES = ("function_call", "function_call_output")
+
 
 class ConversationMemory:
     """
@@ -26,6 +44,9 @@ class ConversationMemory:
         """Initialise with empty sessions and user context dicts."""
         self._sessions: Dict[str, List[Message]] = {}
         self._user_context: Dict[str, Dict[str, Any]] = {}
+        self._last_response_id: Dict[str, str] = {}
+        self._synced_count: Dict[str, int] = {}
+        self._in_flight: Dict[str, Tuple[str, float]] = {}
 
     # ── Message management ─────────────────────────────────────────────────
 
@@ -40,48 +61,48 @@ class ConversationMemory:
             self._sessions[session_id] = []
         self._sessions[session_id].append({"role": role, "content": content})
 
-    def add_assistant_tool_call(self, session_id: str, tool_calls: List[Dict[str, Any]]) -> None:
+    def add_function_calls(self, session_id: str, function_calls: List[Dict[str, Any]]) -> None:
         """
-        Append an assistant message that contains tool_calls (no content text).
+        Append the function_call items the model emitted in its response.
 
-        This is required by the OpenAI API to maintain a valid message sequence
-        when the assistant decided to invoke one or more tools.
+        They are kept so that a replay of the local transcript stays valid:
+        every function_call_output must follow its function_call.
         """
 
         if session_id not in self._sessions:
             self._sessions[session_id] = []
-        self._sessions[session_id].append(
-            {
-                "role": "assistant",
-                "content": None,
-                "tool_calls": tool_calls,
-            }
-        )
+        self._sessions[session_id].extend(function_calls)
 
-    def add_tool_result(self, session_id: str, tool_call_id: str, content: str) -> None:
+    def add_tool_result(self, session_id: str, call_id: str, content: str) -> None:
         """
-        Append a tool result message in the correct OpenAI format.
+        Append a tool result as a function_call_output item.
 
-        tool_call_id must match the id of the corresponding tool_call in the
-        preceding assistant message so the API can correlate them.
+        call_id must match the call_id of the corresponding function_call so
+        the API can correlate them.
         """
 
         if session_id not in self._sessions:
             self._sessions[session_id] = []
         self._sessions[session_id].append(
             {
-                "role": "tool",
-                "tool_call_id": tool_call_id,
-                "content": content,
+                "type": "function_call_output",
+                "call_id": call_id,
+                "output": content,
             }
         )
 
-    def get_history(self, session_id: str) -> List[Message]:
+    def get_history(self, session_id: str, stop: Optional[int] = None) -> List[Message]:
         """
-        Return a copy of the full message history for the given session.
+        Return a copy of the message history for the given session, or of
+        its first `stop` items.
         """
 
-        return list(self._sessions.get(session_id, []))
+        return self._sessions.get(session_id, [])[:stop]
+
+    def message_count(self, session_id: str) -> int:
+        """Return the number of history items without copying them."""
+
+        return len(self._sessions.get(session_id, ()))
 
     def clear_messages(self, session_id: str) -> None:
         """
@@ -89,15 +110,122 @@ class ConversationMemory:
         """
 
         self._sessions.pop(session_id, None)
+        self.reset_response_chain(session_id)
 
     def clear_all(self, session_id: str) -> None:
         """
         Remove everything for the session (messages + user context).
         """
 
-        self._sessions.pop(session_id, None)
+        self.clear_messages(session_id)
         self._user_context.pop(session_id, None)
 
+    def begin_turn(self, session_id: str, user_message: str, within: float) -> Optional[float]:
+        """
+        Mark a turn for user_message as in flight and return its receipt stamp.
+
+        Returns None instead if the same message is already being answered
+        for this session and arrived less than `within` seconds ago (an
+        accidental double-send).
+        """
+
+        now = time.monotonic()
+        current = self._in_flight.get(session_id)
+        if current and current[0] == user_message and now - current[1] < within:
+            return None
+        self._in_flight[session_id] = (user_message, now)
+        return now
+
+    def end_turn(self, session_id: str, stamp: float) -> None:
+        """Clear the in-flight mark set by the begin_turn() that returned stamp."""
+
+        current = self._in_flight.get(session_id)
+        if current and current[1] == stamp:
+            del self._in_flight[session_id]
+
+    # ── Compaction ─────────────────────────────────────────────────────────
+
+    def compaction_cut(self, session_id: str) -> int:
+        """
+        Return how many leading items should be folded into a summary.
+
+        Returns 0 while the session is below COMPACT_THRESHOLD.  The cut
+        always lands on a user message so the kept window never starts with
+        an orphaned tool result.
+        """
+
+        history = self._sessions.get(session_id, [])
+        if len(history) <= COMPACT_THRESHOLD:
+            return 0
+        for index in range(len(history) - RECENT_WINDOW, len(history)):
+            if history[index].get("role") == "user":
+                return index
+        return 0
+
+    def compact(self, session_id: str, cut: int, first_item: Message, summary: str) -> bool:
+        """
+        Replace the first `cut` items with a summary message.
+
+        first_item is the item that was at the head when the summary was
+        requested; if the history changed underneath (cleared or already
+        compacted) nothing is replaced and False is returned.  Tool items
+        older than the last assistant reply in the kept window are dropped.
+        """
+
+        history = self._sessions.get(session_id)
+        if not history or len(history) < cut or history[0] is not first_item:
+            return False
+
+        recent = history[cut:]
+        last_reply = max(
+            (i for i, item in enumerate(recent) if item.get("role") == "assistant"),
+            default=-1,
+        )
+        recent = [
+            item for i, item in enumerate(recent)
+            if i > last_reply or item.get("type") not in _TOOL_ITEM_TYPES
+        ]
+
+        self._sessions[session_id] = [
+            {"role": "system", "content": SUMMARY_PREFIX + summary}
+        ] + recent
+        # The server-side chain still holds the long transcript; start over.
+        self.reset_response_chain(session_id)
+        return True
+
+    # ── Server-side response chain ─────────────────────────────────────────
+
+    def last_response_id(self, session_id: str) -> Optional[str]:
+        """Return the id of the last OpenAI response in this session's chain."""
+
+        return self._last_response_id.get(session_id)
+
+    def set_last_response_id(self, session_id: str, response_id: str) -> None:
+        """
+        Record the latest response id and mark the whole local history as
+        already known to OpenAI.
+        """
+
+        self._last_response_id[session_id] = response_id
+        self._synced_count[session_id] = len(self._sessions.get(session_id, []))
+
+    def get_pending_input(self, session_id: str) -> List[Message]:
+        """
+        Return the items OpenAI has not seen yet.
+
+        With no response chain this is the full history, which is how a
+        fresh chain gets seeded from the local transcript.
+        """
+
+        history = self._sessions.get(session_id, [])
+        return history[self._synced_count.get(session_id, 0):]
+
+    def reset_response_chain(self, session_id: str) -> None:
+        """Forget the server-side chain so the next turn replays local history."""
+
+        self._last_response_id.pop(session_id, None)
+        self._synced_count.pop(session_id, None)
+
     # ── User context management ────────────────────────────────────────────
 
     def set_user_context(self, session_id: str, username: str, club_name: Optional[str], role: str) -> None:
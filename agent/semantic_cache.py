@@ -0,0 +1,163 @@
+"""
+Semantic response cache for read-only questions.
+
+Questions like "what equipment do you have?" or "who has the projector?"
+repeat across a user's sessions and turns.  Replies to them are cached per
+user and per data version, and served again when a new question normalizes
+to the same text or, unless it names a date or time, its embedding is close
+enough.  Only replies built from read-only tool results are stored.
+
+The data version combines the equipment pack tag with the booking engine's
+write generation, which moves on every booking, cancellation, return, and
+user change, so any write invalidates every cached reply.  Entries for
+superseded versions are dropped on the next put.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Tools that never change data; a turn that used anything else is not cached.
+READ_ONLY_TOOLS = frozenset(
+    {
+        "list_equipment",
+        "check_availability",
+        "check_availability_batch",
+        "get_bookings",
+        "get_booking_history",
+        "get_active_bookings",
+        "get_all_booking_history",
+        "list_users",
+    }
+)
+
+# A question must both start like a lookup and mention what it looks up, and
+# must not point back at earlier turns, so context-dependent follow-ups
+# ("what about tomorrow?", "who has it?") are never cached.
+_READ_ONLY_START = re.compile(r"^\s*(what|which|show|list|who|any)\b", re.IGNORECASE)
+_READ_ONLY_SUBJECT = re.compile(
+    r"\b(equipment|inventory|bookings?|booked|available|availability|has|have)\b",
+    re.IGNORECASE,
+)
+_CONTEXT_REFERENCE = re.compile(
+    r"\b(it|its|that|this|these|those|one|ones|them|they|there|same|about)\b",
+    re.IGNORECASE,
+)
+# Dates and times that make a lookup parameterised.  Two such questions can
+# differ only in these words ("Friday 3-5pm" vs "Friday 5-7pm") and still
+# embed almost identically, so they are only ever matched exactly.
+_SLOT_TERMS = re.compile(
+    r"\d|\b(today|tonight|tomorrow|yesterday|now|morning|afternoon|evening|noon|"
+    r"midnight|week|weekend|month|mon|tue|wed|thu|fri|sat|sun|monday|tuesday|"
+    r"wednesday|thursday|friday|saturday|sunday|jan|feb|mar|apr|may|jun|jul|aug|"
+    r"sep|sept|oct|nov|dec|january|february|march|april|june|july|august|"
+    r"september|october|november|december)\b",
+)
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def is_read_only(message: str) -> bool:
+    """Return True if the message looks like a self-contained lookup."""
+
+    return bool(
+        _READ_ONLY_START.match(message)
+        and _READ_ONLY_SUBJECT.search(message)
+        and not _CONTEXT_REFERENCE.search(message)
+    )
+
+
+def normalize(message: str) -> str:
+    """Lower-case the message and strip punctuation and extra whitespace."""
+
+    return _WHITESPACE.sub(" ", _NON_WORD.sub(" ", message.lower())).strip()
+
+
+def names_slot(normalized: str) -> bool:
+    """Return True if a normalized message mentions a date or time."""
+
+    return bool(_SLOT_TERMS.search(normalized))
+
+
+def _unit(vector: Sequence[float]) -> List[float]:
+    """Scale a vector to unit length so a dot product is cosine similarity."""
+
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class SemanticCache:
+    """
+    In-process reply cache keyed by (scope, version).
+
+    scope is the user the reply was written for; version is the data
+    version it was generated against.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries_per_scope: int = 128) -> None:
+        """Initialise an empty cache."""
+
+        self.threshold = threshold
+        self.max_entries_per_scope = max_entries_per_scope
+        self._version = ""
+        # scope -> list of (normalized message, unit embedding, reply)
+        self._entries: Dict[str, List[Tuple[str, Optional[List[float]], str]]] = {}
+        self._lock = threading.Lock()
+
+    def get_exact(self, scope: str, version: str, normalized: str) -> Optional[str]:
+        """Return a cached reply for the exact normalized message, if any."""
+
+        with self._lock:
+            if version != self._version:
+                return None
+            for text, _, reply in self._entries.get(scope, ()):
+                if text == normalized:
+                    return reply
+        return None
+
+    def get_similar(self, scope: str, version: str, embedding: Sequence[float]) -> Optional[str]:
+        """Return the most similar cached reply above the threshold, if any."""
+
+        query = _unit(embedding)
+        best_score = self.threshold
+        best_reply: Optional[str] = None
+        with self._lock:
+            if version != self._version:
+                return None
+            entries = list(self._entries.get(scope, ()))
+
+        for _, vector, reply in entries:
+            if vector is None:
+                continue
+            score = sum(a * b for a, b in zip(query, vector))
+            if score >= best_score:
+                best_score, best_reply = score, reply
+        return best_reply
+
+    def put(
+        self, scope: str, version: str, normalized: str,
+        embedding: Optional[Sequence[float]], reply: str,
+    ) -> None:
+        """
+        Store a reply.  Switching to a new version drops all older entries.
+        """
+
+        vector = _unit(embedding) if embedding else None
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._entries = {}
+            entries = self._entries.setdefault(scope, [])
+            entries.append((normalized, vector, reply))
+            if len(entries) > self.max_entries_per_scope:
+                del entries[0]
+
+
+# Shared singleton used by the agent.
+semantic_cache = SemanticCache()
@@ -6,19 +6,56 @@ functions in core/booking_engine.py.  Every call is wrapped in try/except
 so unexpected errors surface as readable strings rather than exceptions.
 
 Permission enforcement happens here — this is the security boundary.
+The booking engine is synchronous; execute_async() runs a call in a worker
+thread so the agent can run several tool calls concurrently.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from sqlalchemy import select
 
 from core import booking_engine
-from db.database import get_session
+from db.database import read_only_session
 from db.models import Booking
 
 
+# Tool name → (booking_engine function, keyword arguments it takes).
+_DISPATCH: Dict[str, Tuple[Callable[..., str], Tuple[str, ...]]] = {
+    "list_equipment": (booking_engine.list_equipment, ()),
+    "check_availability": (
+        booking_engine.check_availability,
+        ("equipment_name", "date", "start_time", "end_time", "quantity"),
+    ),
+    "check_availability_batch": (
+        booking_engine.check_availability_batch,
+        ("equipment_name", "slots", "quantity"),
+    ),
+    "make_booking": (
+        booking_engine.make_booking,
+        ("equipment_name", "date", "start_time", "end_time", "club_name", "booked_by", "quantity"),
+    ),
+    "get_bookings": (booking_engine.get_bookings, ("club_name",)),
+    "get_booking_history": (booking_engine.get_booking_history, ("club_name",)),
+    "cancel_booking": (booking_engine.cancel_booking, ("booking_id",)),
+    "return_equipment": (booking_engine.return_equipment, ("booking_id",)),
+    "get_active_bookings": (booking_engine.get_active_bookings, ()),
+    "get_all_booking_history": (booking_engine.get_all_booking_history, ()),
+    "list_users": (booking_engine.list_users, ()),
+    "add_user": (booking_engine.add_user, ("username", "club_name")),
+    "remove_user": (booking_engine.remove_user, ("username",)),
+}
+
+# Argument name → (coercion, default).  Anything not listed is a string.
+_STR_ARG: Tuple[Callable[[Any], Any], Any] = (str, "")
+_ARG_TYPES: Dict[str, Tuple[Callable[[Any], Any], Any]] = {
+    "quantity": (int, 1),
+    "slots": (list, []),
+}
+
+
 class ToolExecutor:
     """
     Dispatches tool calls from the agent loop to booking_engine functions.
@@ -31,7 +68,7 @@ class ToolExecutor:
         Returns an error message if not, None if ownership is confirmed.
         """
 
-        with get_session() as session:
+        with read_only_session() as session:
             stmt = select(Booking).where(Booking.booking_id == booking_id.strip())
             booking = session.execute(stmt).scalar_one_or_none()
             if not booking:
@@ -99,7 +136,8 @@ class ToolExecutor:
                 return ownership_error
 
         # These are allowed for all users:
-        # list_equipment, check_availability, get_active_bookings
+        # list_equipment, check_availability, check_availability_batch,
+        # get_active_bookings
         return None
 
     def execute(
@@ -119,70 +157,28 @@ class ToolExecutor:
             if permission_error:
                 return permission_error
 
-            if tool_name == "list_equipment":
-                return booking_engine.list_equipment()
-
-            if tool_name == "check_availability":
-                return booking_engine.check_availability(
-                    equipment_name=str(arguments.get("equipment_name", "")),
-                    date=str(arguments.get("date", "")),
-                    start_time=str(arguments.get("start_time", "")),
-                    end_time=str(arguments.get("end_time", "")),
-                    quantity=int(arguments.get("quantity", 1)),
-                )
-
-            if tool_name == "make_booking":
-                return booking_engine.make_booking(
-                    equipment_name=str(arguments.get("equipment_name", "")),
-                    date=str(arguments.get("date", "")),
-                    start_time=str(arguments.get("start_time", "")),
-                    end_time=str(arguments.get("end_time", "")),
-                    club_name=str(arguments.get("club_name", "")),
-                    booked_by=str(arguments.get("booked_by", "")),
-                    quantity=int(arguments.get("quantity", 1)),
-                )
-
-            if tool_name == "get_bookings":
-                return booking_engine.get_bookings(
-                    club_name=str(arguments.get("club_name", "")),
-                )
-
-            if tool_name == "get_booking_history":
-                return booking_engine.get_booking_history(
-                    club_name=str(arguments.get("club_name", "")),
-                )
-
-            if tool_name == "cancel_booking":
-                return booking_engine.cancel_booking(
-                    booking_id=str(arguments.get("booking_id", "")),
-                )
-
-            if tool_name == "return_equipment":
-                return booking_engine.return_equipment(
-                    booking_id=str(arguments.get("booking_id", "")),
-                )
+            fn, arg_names = _DISPATCH.get(tool_name, (None, ()))
+            if fn is None:
+                return f"Unknown tool '{tool_name}'. No action was taken."
 
-            if tool_name == "get_active_bookings":
-                return booking_engine.get_active_bookings()
+            kwargs: Dict[str, Any] = {}
+            for name in arg_names:
+                coerce, default = _ARG_TYPES.get(name, _STR_ARG)
+                kwargs[name] = coerce(arguments.get(name, default))
+            return fn(**kwargs)
 
-            if tool_name == "get_all_booking_history":
-                return booking_engine.get_all_booking_history()
-
-            if tool_name == "list_users":
-                return booking_engine.list_users()
-
-            if tool_name == "add_user":
-                return booking_engine.add_user(
-                    username=str(arguments.get("username", "")),
-                    club_name=str(arguments.get("club_name", "")),
-                )
+        except Exception as exc:
+            return f"Tool '{tool_name}' encountered an unexpected error: {exc}"
 
-            if tool_name == "remove_user":
-                return booking_engine.remove_user(
-                    username=str(arguments.get("username", "")),
-                )
+    async def execute_async(
+        self, tool_name: str, arguments: Dict[str, Any],
+        user_context: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Run execute() in a worker thread and return its string result.
 
-            return f"Unknown tool '{tool_name}'. No action was taken."
+        Like execute(), this never raises, so callers can gather() several
+        calls without one failure cancelling the rest.
+        """
 
-        except Exception as exc:
-            return f"Tool '{tool_name}' encountered an unexpected error: {exc}"
+        return await asyncio.to_thread(self.execute, tool_name, arguments, user_context)
@@ -1,16 +1,54 @@
 """
 OpenAI function-calling tool schema definitions.
 
-TOOLS is a list of tool specs passed directly to the OpenAI Chat API.
-Each entry follows the standard OpenAI function-calling schema format.
+TOOLS is a tuple of tool specs in the standard OpenAI function-calling
+schema format.  RESPONSES_TOOLS is the same set flattened into the shape
+the Responses API expects.  Both are built once at import and are tuples so
+the shared schema cannot be appended to or reordered at runtime.
+
+Rules that only matter for one kind of action (the booking checklist, date
+handling, Booking ID handling, edge cases) live in the tool and parameter
+descriptions rather than in the system prompt, so the model reads them
+exactly when it decides to call the tool.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Tuple
+
+
+# ── Shared parameter descriptions ─────────────────────────────────────────────
+
+_EQUIPMENT_NAME = (
+    "Name of the equipment (case-insensitive). Match loosely to the inventory "
+    "(\"speaker\" → \"Bluetooth Speaker\") and confirm with the user. If it "
+    "does not exist, list what is available and ask what they need."
+)
+
+_DATE = (
+    "Date in YYYY-MM-DD format. Resolve relative dates (\"tomorrow\", \"next "
+    "Monday\") from the injected current date; assume the current year if "
+    "none is given. Ask if it is missing or ambiguous. A date is past only if "
+    "it is strictly before today — then point it out and ask for a future date."
+)
 
+_START_TIME = "Start time in HH:MM 24-hour format (\"3pm\" → \"15:00\")."
 
-TOOLS: List[Dict[str, Any]] = [
+_END_TIME = (
+    "End time in HH:MM 24-hour format. If it is before the start time, ask "
+    "the user to clarify. A slot today is past only if this is before the "
+    "current time."
+)
+
+_BOOKING_ID = (
+    "The EXACT Booking ID as the user typed it (e.g. B006). Never modify, "
+    "reformat, pad, or guess it — \"B0006\" stays \"B0006\". If it is not "
+    "found, ask the user to check the ID they received; never retry with a "
+    "\"corrected\" one."
+)
+
+
+TOOLS: Tuple[Dict[str, Any], ...] = (
     {
         "type": "function",
         "function": {
@@ -32,26 +70,30 @@ TOOLS: List[Dict[str, Any]] = [
             "name": "check_availability",
             "description": (
                 "Check if a specific equipment is available for a given date and time slot. "
-                "Always call this before make_booking."
+                "Always call this before make_booking, with the requested quantity. "
+                "Be specific in the reply, e.g. \"✅ Projector is available on 15 March "
+                "from 3–5 PM\" or \"❌ Projector is booked from 2–6 PM by Tech Club. "
+                "Next available slot is after 6 PM.\" If not enough units are free, "
+                "say how many are and when they free up, and let the user decide."
             ),
             "parameters": {
                 "type": "object",
                 "properties": {
                     "equipment_name": {
                         "type": "string",
-                        "description": "Name of the equipment to check (case-insensitive).",
+                        "description": _EQUIPMENT_NAME,
                     },
                     "date": {
                         "type": "string",
-                        "description": "Date of the booking in YYYY-MM-DD format.",
+                        "description": _DATE,
                     },
                     "start_time": {
                         "type": "string",
-                        "description": "Start time in HH:MM 24-hour format.",
+                        "description": _START_TIME,
                     },
                     "end_time": {
                         "type": "string",
-                        "description": "End time in HH:MM 24-hour format.",
+                        "description": _END_TIME,
                     },
                     "quantity": {
                         "type": "integer",
@@ -62,36 +104,92 @@ TOOLS: List[Dict[str, Any]] = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "check_availability_batch",
+            "description": (
+                "Check several candidate time slots for one equipment at once, e.g. "
+                "to find any free 2-hour window today or compare a few options. "
+                "Use this instead of repeated check_availability calls. A slot "
+                "reported free here counts as checked for make_booking."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "equipment_name": {
+                        "type": "string",
+                        "description": _EQUIPMENT_NAME,
+                    },
+                    "slots": {
+                        "type": "array",
+                        "description": "Candidate slots to check (at most 24).",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "date": {"type": "string", "description": _DATE},
+                                "start_time": {"type": "string", "description": _START_TIME},
+                                "end_time": {"type": "string", "description": _END_TIME},
+                            },
+                            "required": ["date", "start_time", "end_time"],
+                        },
+                    },
+                    "quantity": {
+                        "type": "integer",
+                        "description": "Number of units needed. Defaults to 1 if not specified.",
+                    },
+                },
+                "required": ["equipment_name", "slots"],
+            },
+        },
+    },
     {
         "type": "function",
         "function": {
             "name": "make_booking",
             "description": (
-                "Create a new equipment booking after confirming availability. "
-                "Always call check_availability first."
+                "Create a new equipment booking. Collect the equipment, quantity "
+                "(ask if not mentioned), date, start and end time, and contact person "
+                "one or two questions at a time — never all at once. The club is "
+                "automatic for regular users; only ask admins. Call only after "
+                "check_availability confirms enough units are free. On success show "
+                "this summary:\n"
+                "✅ Booking Confirmed!\n"
+                "─────────────────────\n"
+                "Equipment : Projector x2\n"
+                "Club      : Robotics Club\n"
+                "Date      : 15 March 2025\n"
+                "Time      : 3:00 PM – 5:00 PM\n"
+                "Booking ID: B007\n"
+                "Contact   : Raj\n"
+                "─────────────────────\n"
+                "Save your Booking ID — you will need it to cancel or return."
             ),
             "parameters": {
                 "type": "object",
                 "properties": {
                     "equipment_name": {
                         "type": "string",
-                        "description": "Name of the equipment to book (case-insensitive).",
+                        "description": _EQUIPMENT_NAME,
                     },
                     "date": {
                         "type": "string",
-                        "description": "Date of the booking in YYYY-MM-DD format.",
+                        "description": _DATE,
                     },
                     "start_time": {
                         "type": "string",
-                        "description": "Start time in HH:MM 24-hour format.",
+                        "description": _START_TIME,
                     },
                     "end_time": {
                         "type": "string",
-                        "description": "End time in HH:MM 24-hour format.",
+                        "description": _END_TIME,
                     },
                     "club_name": {
                         "type": "string",
-                        "description": "Name of the club making the booking.",
+                        "description": (
+                            "Name of the club making the booking. If it seems "
+                            "incomplete, use what was given."
+                        ),
                     },
                     "booked_by": {
                         "type": "string",
@@ -134,7 +232,11 @@ TOOLS: List[Dict[str, Any]] = [
         "type": "function",
         "function": {
             "name": "get_booking_history",
-            "description": "Get past bookings (returned or cancelled) for a specific club. Use this when the user asks for booking history or past bookings.",
+            "description": (
+                "Get past bookings (returned or cancelled) for a specific club. Use "
+                "this — not get_bookings, which only shows active ones — for "
+                "\"past bookings\", \"booking history\", or \"previous bookings\"."
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -151,13 +253,17 @@ TOOLS: List[Dict[str, Any]] = [
         "type": "function",
         "function": {
             "name": "cancel_booking",
-            "description": "Cancel an active booking using its Booking ID.",
+            "description": (
+                "Cancel an active booking using its Booking ID. A booking that is "
+                "already cancelled or returned cannot be cancelled — tell the user "
+                "politely."
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
                     "booking_id": {
                         "type": "string",
-                        "description": "The EXACT Booking ID as provided by the user (e.g. B006). Do NOT modify, reformat, or guess — pass it exactly as the user typed it.",
+                        "description": _BOOKING_ID,
                     },
                 },
                 "required": ["booking_id"],
@@ -168,13 +274,16 @@ TOOLS: List[Dict[str, Any]] = [
         "type": "function",
         "function": {
             "name": "return_equipment",
-            "description": "Mark equipment as returned using Booking ID. Updates availability.",
+            "description": (
+                "Mark equipment as returned using its Booking ID. Updates availability. "
+                "Only active bookings can be returned."
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
                     "booking_id": {
                         "type": "string",
-                        "description": "The EXACT Booking ID as provided by the user (e.g. B006). Do NOT modify, reformat, or guess — pass it exactly as the user typed it.",
+                        "description": _BOOKING_ID,
                     },
                 },
                 "required": ["booking_id"],
@@ -269,4 +378,13 @@ TOOLS: List[Dict[str, Any]] = [
             },
         },
     },
-]
+)
+
+
+# The Responses API takes name/description/parameters at the top level of
+# each tool.  strict is disabled because several parameters are optional,
+# which strict mode does not allow.
+RESPONSES_TOOLS: Tuple[Dict[str, Any], ...] = tuple(
+    {"type": "function", **tool["function"], "strict": False}
+    for tool in TOOLS
+)
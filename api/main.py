@@ -5,22 +5,34 @@ Endpoints:
 - GET  /          → redirect to /ui/index.html
 - GET  /health    → simple health check
 - POST /chat      → chat interface with per-session memory
+- POST /chat/stream → same as /chat, streamed as server-sent events
 - Static files at /ui served from the ui/ directory
+
+The agent (and with it the OpenAI SDK and database layer) is imported in
+the lifespan handler, not at module import.  Each worker process owns one
+AsyncOpenAI connection pool for its lifetime.  To serve the API on its own:
+
+    uvicorn api.main:app --workers 1 --loop uvloop --http httptools --log-level warning
+
+Conversation memory, the semantic cache and the equipment cache live in
+process memory, so keep one worker: even with sticky sessions, a write in
+one worker would not invalidate another worker's cached replies.
 """
 
 from __future__ import annotations
 
+import asyncio
 import uuid
 import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
 
-from fastapi import FastAPI
+import orjson
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional
-
-from agent.agent import agent
 
 
 logger = logging.getLogger(__name__)
@@ -44,7 +56,50 @@ class ChatResponse(BaseModel):
 
 # ─── App setup ────────────────────────────────────────────────────────────────
 
-app = FastAPI(title="EquiBot — College Equipment Booking Bot")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Give this worker its own OpenAI connection pool for its lifetime.
+
+    Each uvicorn worker process runs this once: the client is created on
+    the worker's event loop, handed to the agent, and closed on shutdown.
+    A cheap request warms it up in the background so the first chat skips
+    the TLS handshake without holding up startup (or /health) while OpenAI
+    is slow or unreachable.  The agent itself is imported here rather than
+    at module import so the app still imports quickly.
+    """
+
+    from agent.agent import create_client, get_agent as _get_agent
+
+    agent = _get_agent()
+    client = create_client(max_connections=200)
+    agent.bind_client(client)
+    app.state.agent = agent
+    warm_up = asyncio.create_task(_warm_up(client))
+
+    yield
+
+    warm_up.cancel()
+    agent.unbind_client()
+    await client.close()
+
+
+async def _warm_up(client: Any) -> None:
+    """Open the OpenAI connection with one short, unretried request."""
+
+    try:
+        await client.with_options(timeout=5, max_retries=0).models.list()
+    except Exception:
+        logger.warning("OpenAI warm-up failed", exc_info=True)
+
+
+def get_agent(request: Request) -> Any:
+    """FastAPI dependency returning this worker's agent."""
+
+    return request.app.state.agent
+
+
+app = FastAPI(title="EquiBot — College Equipment Booking Bot", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -75,7 +130,7 @@ async def health() -> dict:
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(request: ChatRequest, agent: Any = Depends(get_agent)) -> ChatResponse:
     """
     Chat endpoint that proxies messages to the booking agent.
 
@@ -86,7 +141,7 @@ async def chat(request: ChatRequest) -> ChatResponse:
     session_id = request.session_id or str(uuid.uuid4())
 
     try:
-        reply = agent.chat(session_id, request.message)
+        reply = await agent.chat(session_id, request.message)
         return ChatResponse(response=reply, session_id=session_id)
     except Exception as exc:
         logger.exception("Unhandled error in /chat endpoint")
@@ -94,3 +149,34 @@ async def chat(request: ChatRequest) -> ChatResponse:
             response=f"⚠️ An error occurred while handling your request: {exc}",
             session_id=session_id,
         )
+
+
+@app.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest, agent: Any = Depends(get_agent),
+) -> StreamingResponse:
+    """
+    Streaming variant of /chat using server-sent events.
+
+    Each event is `data: {"token": "..."}`; the stream ends with an
+    `event: done` message.  The session id is returned in the
+    X-Session-Id response header.
+    """
+
+    session_id = request.session_id or str(uuid.uuid4())
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for token in agent.stream_chat(session_id, request.message):
+                yield f"data: {orjson.dumps({'token': token}).decode()}\n\n"
+        except Exception as exc:
+            logger.exception("Unhandled error in /chat/stream endpoint")
+            error = f"⚠️ An error occurred while handling your request: {exc}"
+            yield f"data: {orjson.dumps({'token': error}).decode()}\n\n"
+        yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"X-Session-Id": session_id, "Cache-Control": "no-cache"},
+    )
@@ -21,13 +21,18 @@ from telegram.ext import (
     filters,
 )
 
-from agent.agent import agent
+from agent.agent import get_agent
 from agent.memory import memory
+from agent.prompts import HELP_TEXT
 import config
 
 
 logger = logging.getLogger(__name__)
 
+# Minimum delay between progressive edits of a streamed reply.  Telegram
+# throttles frequent edits in the same chat, so tokens are batched.
+STREAM_EDIT_INTERVAL = 1.0
+
 
 WELCOME_TEXT = (
     "👋 Welcome to Gear Genix — College Equipment Booking Assistant!\n\n"
@@ -42,17 +47,6 @@ WELCOME_TEXT = (
     "Example: 'Is the projector free tomorrow 3-5pm?'"
 )
 
-HELP_TEXT = (
-    "Here are some things you can ask me:\n\n"
-    "📦 'What equipment do you have?'\n"
-    "🔍 'Is the projector free on Friday 2-4pm?'\n"
-    "📅 'Book a mic for Robotics Club tomorrow 10am-12pm'\n"
-    "📋 'Show bookings for Drama Club'\n"
-    "❌ 'Cancel booking B007'\n"
-    "🔄 'Return equipment for booking B005'\n"
-    "👁 'Who has the projector right now?'"
-)
-
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start — send the welcome message."""
@@ -73,14 +67,19 @@ async def clear_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 
     if update.effective_chat:
         session_id = str(update.effective_chat.id)
-        memory.clear_history(session_id)
+        memory.clear_messages(session_id)
         await update.effective_chat.send_message(
             "🗑️ Conversation cleared! Starting fresh."
         )
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle any non-command text message by passing it to the agent."""
+    """
+    Handle any non-command text message by passing it to the agent.
+
+    The reply is streamed: the first tokens are sent as a new message which
+    is then edited in place as more text arrives.
+    """
 
     if not update.effective_chat or not update.message:
         return
@@ -90,18 +89,34 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if not text:
         return
 
+    sent = None
+    shown = ""
+    reply = ""
     try:
         # Show typing indicator while the agent is working.
         await update.effective_chat.send_chat_action(ChatAction.TYPING)
 
-        # Run the synchronous agent in a thread pool to avoid blocking the event loop.
         loop = asyncio.get_running_loop()
-        reply = await loop.run_in_executor(None, agent.chat, session_id, text)
+        last_edit = 0.0
+        async for token in get_agent().stream_chat(session_id, text):
+            reply += token
+            if not reply.strip() or loop.time() - last_edit < STREAM_EDIT_INTERVAL:
+                continue
+            if sent is None:
+                sent = await update.message.reply_text(reply)
+            else:
+                await sent.edit_text(reply)
+            shown = reply
+            last_edit = loop.time()
     except Exception:
         logger.exception("Agent failed to handle Telegram message")
         reply = "⚠️ Something went wrong. Please try again."
 
-    await update.message.reply_text(reply)
+    reply = reply or "⚠️ Something went wrong. Please try again."
+    if sent is None:
+        await update.message.reply_text(reply)
+    elif reply != shown:
+        await sent.edit_text(reply)
 
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
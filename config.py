@@ -4,11 +4,16 @@ Application configuration loaded from environment variables.
 Imports validate that all required keys are present and raise a clear
 error message naming whichever key is missing, so the developer knows
 exactly what to add to their .env file.
+
+OPENAI_API_KEY is validated on first access instead (module __getattr__),
+so processes that never call OpenAI — health checks, seeding — do not need
+it to start.
 """
 
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
@@ -30,7 +35,29 @@ def _require(key: str) -> str:
     return value
 
 
-OPENAI_API_KEY: str = _require("OPENAI_API_KEY")
 TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()  # optional — bot skipped if absent
 DATABASE_URL: str = _require("DATABASE_URL")
 ADMIN_USERNAME: str = _require("ADMIN_USERNAME")
+
+# Fast model for the agent loop; the larger model handles long messages and
+# turns where the fast model produced no answer.
+OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-5-mini").strip()
+OPENAI_ESCALATION_MODEL: str = os.getenv("OPENAI_ESCALATION_MODEL", "gpt-5.2").strip()
+
+# Settings validated on first access rather than at import.
+_LAZY_REQUIRED = frozenset({"OPENAI_API_KEY"})
+
+
+@lru_cache(maxsize=None)
+def _require_lazy(key: str) -> str:
+    """Validate a lazily required key once; failures are not cached."""
+
+    return _require(key)
+
+
+def __getattr__(name: str) -> str:
+    """Resolve lazily validated settings such as config.OPENAI_API_KEY."""
+
+    if name in _LAZY_REQUIRED:
+        return _require_lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
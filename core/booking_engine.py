@@ -3,20 +3,164 @@ Core booking engine used by the AI agent tools.
 
 Each function performs a specific business operation against the database
 (list equipment, check availability, create bookings, etc.).  All database
-access goes through SQLAlchemy ORM sessions.  Every function returns a
-plain string so the agent can relay the result directly to the user.
+access goes through SQLAlchemy sessions; functions that only read use
+read_only_session().  Every function returns a plain string so the agent
+can relay the result directly to the user.
+
+The equipment inventory is also rendered into a versioned text "pack" that
+the agent embeds in its prompt; it is memoized in-process and invalidated by
+every write that changes availability.
 """
 
 from __future__ import annotations
 
+import hashlib
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from itertools import chain, count
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    and_,
+    bindparam,
+    column,
+    func,
+    literal_column,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.engine import Row
+
+from db.database import get_session, read_only_session
+from db.models import Booking, Equipment, User, booking_seq
+
+
+# ─── Prebuilt statements ─────────────────────────────────────────────────────
+# Built once at import and executed with bound parameters, so hot paths skip
+# rebuilding the expression tree and its cache key on every call.
+
+# Rows fetched per round trip when streaming a listing.
+_STREAM_BATCH_SIZE = 200
+
+# Read-only listings select just these columns as plain rows instead of
+# hydrating ORM objects (and their relationships) they only read from.
+_EQUIPMENT_ROW_COLUMNS = (
+    Equipment.name,
+    Equipment.total_quantity,
+    Equipment.available_quantity,
+    Equipment.condition,
+)
+_BOOKING_ROW_COLUMNS = (
+    Equipment.name.label("equipment_name"),
+    Booking.quantity,
+    Booking.club_name,
+    Booking.booked_by,
+    Booking.start_time,
+    Booking.end_time,
+    Booking.status,
+)
+
+_PAST_STATUSES = ("returned", "cancelled")
+
+_EQUIPMENT_LIST_STMT = (
+    select(*_EQUIPMENT_ROW_COLUMNS)
+    .order_by(Equipment.name.asc())
+    .execution_options(yield_per=_STREAM_BATCH_SIZE)
+)
+
+_EQUIPMENT_CATALOG_STMT = select(Equipment.id, Equipment.name, Equipment.total_quantity)
+
+_BOOKING_ROWS = select(*_BOOKING_ROW_COLUMNS).join_from(Booking, Equipment)
+
+_CLUB_ACTIVE_STMT = (
+    _BOOKING_ROWS
+    .where(Booking.club_name.ilike(bindparam("club_pattern")))
+    .where(Booking.status == "active")
+    .order_by(Booking.start_time.asc())
+    .execution_options(yield_per=_STREAM_BATCH_SIZE)
+)
+_CLUB_HISTORY_STMT = (
+    _BOOKING_ROWS
+    .where(Booking.club_name.ilike(bindparam("club_pattern")))
+    .where(Booking.status.in_(_PAST_STATUSES))
+    .order_by(Booking.start_time.desc())
+    .execution_options(yield_per=_STREAM_BATCH_SIZE)
+)
+_ALL_ACTIVE_STMT = (
+    _BOOKING_ROWS
+    .where(Booking.status == "active")
+    .order_by(Booking.start_time.asc())
+    .execution_options(yield_per=_STREAM_BATCH_SIZE)
+)
+_ALL_HISTORY_STMT = (
+    _BOOKING_ROWS
+    .where(Booking.status.in_(_PAST_STATUSES))
+    .order_by(Booking.start_time.desc())
+    .execution_options(yield_per=_STREAM_BATCH_SIZE)
+)
+
+# Units booked and the latest end time over active bookings of one piece of
+# equipment overlapping a slot.  Written as a half-open tsrange overlap (&&)
+# so it matches, and can use, the ix_bookings_period GiST index.
+_SLOT_BOUNDS = literal_column("'[)'")
+_BOOKED_IN_SLOT_STMT = (
+    select(func.coalesce(func.sum(Booking.quantity), 0), func.max(Booking.end_time))
+    .where(Booking.equipment_id == bindparam("eq_id"))
+    .where(Booking.status == "active")
+    .where(
+        func.tsrange(Booking.start_time, Booking.end_time, _SLOT_BOUNDS).op("&&")(
+            func.tsrange(bindparam("slot_start"), bindparam("slot_end"), _SLOT_BOUNDS)
+        )
+    )
+)
+
+_LOCK_EQUIPMENT_STMT = (
+    select(Equipment.id).where(Equipment.id == bindparam("eq_id")).with_for_update()
+)
+
+_NEXT_BOOKING_NUMBER_STMT = select(booking_seq.next_value())
+
+_BOOKING_STATUS_STMT = select(Booking.status).where(Booking.booking_id == bindparam("b_id"))
+
+# Nothing these UPDATEs touch is loaded in the session, so skip
+# synchronizing the identity map.
+_CLOSE_BOOKING_STMT = (
+    update(Booking)
+    .where(Booking.booking_id == bindparam("b_id"))
+    .where(Booking.status == "active")
+    .values(status=bindparam("new_status"))
+    .returning(Booking.equipment_id, Booking.quantity)
+    .execution_options(synchronize_session=False)
+)
+_ADJUST_AVAILABLE_STMT = (
+    update(Equipment)
+    .where(Equipment.id == bindparam("eq_id"))
+    .values(available_quantity=Equipment.available_quantity + bindparam("delta"))
+    .returning(Equipment.name)
+    .execution_options(synchronize_session=False)
+)
+
+
+def _stream_rows(session, stmt, params: Optional[dict] = None) -> Optional[Iterator[Row]]:
+    """
+    Execute a listing query on a server-side cursor.
 
-from sqlalchemy import func, select
-from sqlalchemy.orm import selectinload
+    Listing statements carry yield_per, so rows are fetched in batches of
+    _STREAM_BATCH_SIZE as the caller iterates and only one batch is held
+    in memory.  Returns None if there are no rows, so callers can still
+    report an empty listing; iterate before the session closes.
+    """
 
-from db.database import get_session
-from db.models import Booking, Equipment, User
+    rows = iter(session.execute(stmt, params))
+    first = next(rows, None)
+    if first is None:
+        return None
+    return chain((first,), rows)
 
 
 # ─── Date / time helpers ─────────────────────────────────────────────────────
@@ -33,19 +177,200 @@ def _parse_slot(date: str, start_time: str, end_time: str) -> tuple[datetime, da
     Raises ValueError if parsing fails — callers should handle this.
     """
 
-    start_dt = datetime.strptime(f"{date} {start_time}", _DATETIME_FMT)
-    end_dt = datetime.strptime(f"{date} {end_time}", _DATETIME_FMT)
-    return start_dt, end_dt
+    return _parse_datetime(date, start_time), _parse_datetime(date, end_time)
+
+
+def _parse_datetime(date: str, time_str: str) -> datetime:
+    """
+    Parse 'YYYY-MM-DD' and 'HH:MM' into a datetime.
+
+    fromisoformat is a fixed-format C parser, but it also accepts basic and
+    week dates ('20261015', '2026-W42-4'), seconds, bare hours and UTC
+    offsets, so it is only used when the input is shaped exactly like
+    'YYYY-MM-DD' and 'HH:MM'.  Everything else goes through strptime, which
+    allows lenient input like '9:00' and rejects the rest with ValueError.
+    """
+
+    if (
+        len(date) == 10 and date[4] == date[7] == "-"
+        and len(time_str) == 5 and time_str[2] == ":"
+    ):
+        try:
+            return datetime.fromisoformat(f"{date}T{time_str}")
+        except ValueError:
+            pass
+    return datetime.strptime(f"{date} {time_str}", _DATETIME_FMT)
+
+
+# Formatting is done with arithmetic and these tables rather than strftime:
+# it is cheaper per row, locale-independent, and avoids the glibc-only "%-d".
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+_SHORT_MONTHS = tuple(month[:3] for month in _MONTHS)
+
+
+# The labels below are memoized: bookings cluster on a few dates and on
+# round times, and there are only 1440 distinct minutes in a day.
+
+@lru_cache(maxsize=1440)
+def _time_label(hour: int, minute: int) -> str:
+    """Return a time label like '3:00 PM'."""
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+@lru_cache(maxsize=512)
+def _date_label(year: int, month: int, day: int) -> str:
+    """Return a date label like '15 March 2025'."""
+    return f"{day} {_MONTHS[month - 1]} {year}"
+
+
+@lru_cache(maxsize=512)
+def _short_date_label(month: int, day: int) -> str:
+    """Return a short date label like '15 Mar'."""
+    return f"{day} {_SHORT_MONTHS[month - 1]}"
 
 
 def _fmt_time(dt: datetime) -> str:
     """Return a time string like '3:00 PM'."""
-    return dt.strftime("%I:%M %p").lstrip("0")
+    return _time_label(dt.hour, dt.minute)
 
 
 def _fmt_date(dt: datetime) -> str:
     """Return a date string like '15 March 2025'."""
-    return dt.strftime("%-d %B %Y")
+    return _date_label(dt.year, dt.month, dt.day)
+
+
+def _fmt_row_slot(b: Row) -> str:
+    """Return a listing row's slot like '15 Mar | 3:00 PM–5:00 PM'."""
+    start = b.start_time
+    return (
+        f"{_short_date_label(start.month, start.day)} | "
+        f"{_fmt_time(start)}–{_fmt_time(b.end_time)}"
+    )
+
+
+def _fmt_equipment_line(i: int, eq: Row) -> str:
+    """Return one numbered inventory line shared by the list and the pack."""
+    return (
+        f"{i}. {eq.name} — {eq.available_quantity}/{eq.total_quantity} "
+        f"available ({eq.condition})"
+    )
+
+
+# ─── Equipment catalog ───────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class EquipmentSnapshot:
+    """The static fields of an equipment row, safe to share across threads."""
+
+    id: int
+    name: str
+    total_quantity: int
+
+
+# Equipment is seeded at startup and not edited by the app, but can change
+# through manual SQL.  The catalog and the pack below are both reloaded at
+# least this often, so they never disagree for longer than that.
+_EQUIPMENT_TTL_SECONDS = 60.0
+
+# name.lower() -> snapshot.  Replaced as a whole on refresh, never mutated.
+_EQUIPMENT_CACHE: Dict[str, EquipmentSnapshot] = {}
+_equipment_cache_loaded_at = float("-inf")
+
+
+def refresh_equipment_cache() -> None:
+    """Reload the equipment catalog with a single query.  Call after seeding."""
+
+    global _EQUIPMENT_CACHE, _equipment_cache_loaded_at
+
+    with read_only_session() as session:
+        _EQUIPMENT_CACHE = {
+            row.name.lower(): EquipmentSnapshot(row.id, row.name, row.total_quantity)
+            for row in session.execute(_EQUIPMENT_CATALOG_STMT)
+        }
+    _equipment_cache_loaded_at = time.monotonic()
+
+
+def _find_equipment(equipment_name: str) -> Optional[EquipmentSnapshot]:
+    """
+    Return the equipment with this case-insensitive name, or None.
+
+    The catalog is reloaded once it is older than _EQUIPMENT_TTL_SECONDS,
+    so changed quantities are picked up, and on an unknown name, so
+    equipment added outside the app is found straight away.
+    """
+
+    key = equipment_name.lower()
+    if time.monotonic() - _equipment_cache_loaded_at >= _EQUIPMENT_TTL_SECONDS:
+        refresh_equipment_cache()
+        return _EQUIPMENT_CACHE.get(key)
+
+    equipment = _EQUIPMENT_CACHE.get(key)
+    if equipment is None:
+        refresh_equipment_cache()
+        equipment = _EQUIPMENT_CACHE.get(key)
+    return equipment
+
+
+# ─── Equipment pack (prompt cache) ───────────────────────────────────────────
+
+# (pack_text, version, built_at) — replaced atomically, never mutated.
+_equipment_pack: Optional[tuple[str, str, float]] = None
+
+
+def get_equipment_version() -> tuple[str, str]:
+    """
+    Return (pack_text, version) describing the current equipment inventory.
+
+    version is a short md5 tag of the inventory, also embedded in the text,
+    so downstream caches can key on it.  Returns ("", "") if the inventory
+    cannot be read; failures are not cached.
+    """
+
+    global _equipment_pack
+
+    # The TTL catches changes made outside this process (manual SQL); writes
+    # made here drop the pack immediately.
+    cached = _equipment_pack
+    if cached is not None and time.monotonic() - cached[2] < _EQUIPMENT_TTL_SECONDS:
+        return cached[0], cached[1]
+
+    with read_only_session() as session:
+        try:
+            body = "\n".join(
+                _fmt_equipment_line(i, eq)
+                for i, eq in enumerate(session.execute(_EQUIPMENT_LIST_STMT), start=1)
+            )
+        except Exception:
+            return "", ""
+
+    version = hashlib.md5(body.encode()).hexdigest()[:8]
+    pack_text = f"EQUIPMENT INVENTORY (version {version}):\n{body or 'No equipment.'}"
+    _equipment_pack = (pack_text, version, time.monotonic())
+    return pack_text, version
+
+
+# Bumped on every committed write (bookings and users), so caches of replies
+# derived from the data can tell that anything at all has changed.
+_write_counter = count(1)
+_write_generation = 0
+
+
+def get_write_generation() -> int:
+    """Return a number that changes after every write made by this process."""
+
+    return _write_generation
+
+
+def _record_write() -> None:
+    """Drop the memoized pack and bump the write generation after a commit."""
+
+    global _equipment_pack, _write_generation
+    _equipment_pack = None
+    _write_generation = next(_write_counter)
 
 
 # ─── Public API ───────────────────────────────────────────────────────────────
@@ -56,23 +381,20 @@ def list_equipment() -> str:
     Return a formatted list of all equipment, availability, and condition.
     """
 
-    with get_session() as session:
+    with read_only_session() as session:
         try:
-            stmt = select(Equipment).order_by(Equipment.name.asc())
-            equipment_list: List[Equipment] = list(session.execute(stmt).scalars())
-        except Exception as exc:
-            return f"Failed to list equipment due to an internal error: {exc}"
+            equipment_rows = _stream_rows(session, _EQUIPMENT_LIST_STMT)
 
-    if not equipment_list:
-        return "No equipment found in the system."
+            if equipment_rows is None:
+                return "No equipment found in the system."
 
-    lines = ["📦 Available Equipment:", "─────────────────────"]
-    for i, eq in enumerate(equipment_list, start=1):
-        lines.append(
-            f"{i}. {eq.name} — {eq.available_quantity}/{eq.total_quantity} available ({eq.condition})"
-        )
-    lines.append("─────────────────────")
-    return "\n".join(lines)
+            return "\n".join(chain(
+                ("📦 Available Equipment:", "─────────────────────"),
+                (_fmt_equipment_line(i, eq) for i, eq in enumerate(equipment_rows, start=1)),
+                ("─────────────────────",),
+            ))
+        except Exception as exc:
+            return f"Failed to list equipment due to an internal error: {exc}"
 
 
 def check_availability(
@@ -82,8 +404,8 @@ def check_availability(
     """
     Check whether a specific piece of equipment is free for a given time slot.
 
-    Conflict detection uses the standard interval-overlap condition:
-      existing.start_time < new_end AND existing.end_time > new_start
+    Conflict detection uses the half-open range-overlap condition:
+      tsrange(existing.start_time, existing.end_time) && tsrange(new_start, new_end)
     with status == 'active'.  The quantities of all overlapping bookings
     are summed to determine how many units remain available in the slot.
     """
@@ -99,12 +421,9 @@ def check_availability(
     if quantity < 1:
         return "Quantity must be at least 1."
 
-    with get_session() as session:
+    with read_only_session() as session:
         try:
-            eq_stmt = select(Equipment).where(
-                func.lower(Equipment.name) == equipment_name.lower()
-            )
-            equipment = session.execute(eq_stmt).scalar_one_or_none()
+            equipment = _find_equipment(equipment_name)
             if not equipment:
                 return (
                     f"Equipment '{equipment_name}' not found. "
@@ -117,25 +436,16 @@ def check_availability(
                     f"{equipment.name} exist in total."
                 )
 
-            conflict_stmt = (
-                select(Booking)
-                .where(Booking.equipment_id == equipment.id)
-                .where(Booking.status == "active")
-                .where(Booking.start_time < end_dt)
-                .where(Booking.end_time > start_dt)
-                .order_by(Booking.start_time.asc())
+            total_booked_in_slot, last_end = _booked_in_slot(
+                session, equipment.id, start_dt, end_dt,
             )
-            conflicts: List[Booking] = list(session.execute(conflict_stmt).scalars())
-
-            total_booked_in_slot = sum(b.quantity for b in conflicts)
             available_in_slot = equipment.total_quantity - total_booked_in_slot
 
             if available_in_slot <= 0:
-                last_conflict = max(conflicts, key=lambda b: b.end_time)
                 return (
                     f"❌ All {equipment.total_quantity} unit(s) of {equipment.name} "
                     f"are booked during that time. "
-                    f"Next available after {_fmt_time(last_conflict.end_time)}."
+                    f"Next available after {_fmt_time(last_end)}."
                 )
 
             if quantity > available_in_slot:
@@ -154,27 +464,126 @@ def check_availability(
             return f"Failed to check availability due to an internal error: {exc}"
 
 
-def _generate_booking_id(session) -> str:
+# Upper bound on slots per batch check, to keep one tool call bounded.
+_MAX_BATCH_SLOTS = 24
+
+
+def check_availability_batch(
+    equipment_name: str, slots: List[Dict[str, str]], quantity: int = 1,
+) -> str:
     """
-    Generate the next booking ID in the sequence B001, B002, ...
+    Check several candidate slots for one piece of equipment in one query.
 
-    Queries the current maximum booking_id and increments it instead of
-    counting rows, so gaps from cancellations are handled correctly.
+    Each slot is a dict with date, start_time and end_time.  The slots are
+    sent as a VALUES list and outer-joined against active bookings with the
+    same overlap condition as check_availability, so N candidates cost one
+    round trip instead of N.  Returns one line per slot.
     """
 
-    stmt = select(Booking.booking_id)
-    all_ids = list(session.execute(stmt).scalars())
+    if quantity < 1:
+        return "Quantity must be at least 1."
+    if not slots:
+        return "Please give at least one time slot to check."
+    if len(slots) > _MAX_BATCH_SLOTS:
+        return f"Please check at most {_MAX_BATCH_SLOTS} time slots at a time."
+
+    # Parse every slot up front; invalid ones are reported, not queried.
+    parsed: List[Optional[tuple[datetime, datetime]]] = []
+    for slot in slots:
+        try:
+            start_dt, end_dt = _parse_slot(
+                str(slot.get("date", "")), str(slot.get("start_time", "")),
+                str(slot.get("end_time", "")),
+            )
+        except (AttributeError, ValueError):
+            parsed.append(None)
+            continue
+        parsed.append((start_dt, end_dt) if end_dt > start_dt else None)
+    rows = [(i, *slot) for i, slot in enumerate(parsed) if slot is not None]
 
-    max_num = 0
-    for bid in all_ids:
+    with read_only_session() as session:
         try:
-            num = int(bid[1:])  # strip leading 'B'
-            if num > max_num:
-                max_num = num
-        except (ValueError, TypeError, IndexError):
+            equipment = _find_equipment(equipment_name)
+            if not equipment:
+                return (
+                    f"Equipment '{equipment_name}' not found. "
+                    "Use list_equipment to see available options."
+                )
+            if quantity > equipment.total_quantity:
+                return (
+                    f"❌ Only {equipment.total_quantity} unit(s) of "
+                    f"{equipment.name} exist in total."
+                )
+
+            booked: Dict[int, int] = {}
+            if rows:
+                candidates = values(
+                    column("slot_id", Integer),
+                    column("slot_start", DateTime),
+                    column("slot_end", DateTime),
+                    name="candidate_slots",
+                ).data(rows)
+                stmt = (
+                    select(candidates.c.slot_id, func.coalesce(func.sum(Booking.quantity), 0))
+                    .select_from(candidates)
+                    .outerjoin(
+                        Booking,
+                        and_(
+                            Booking.equipment_id == equipment.id,
+                            Booking.status == "active",
+                            func.tsrange(Booking.start_time, Booking.end_time, _SLOT_BOUNDS).op("&&")(
+                                func.tsrange(
+                                    candidates.c.slot_start, candidates.c.slot_end, _SLOT_BOUNDS,
+                                )
+                            ),
+                        ),
+                    )
+                    .group_by(candidates.c.slot_id)
+                )
+                booked = dict(session.execute(stmt).tuples())
+        except Exception as exc:
+            return f"Failed to check availability due to an internal error: {exc}"
+
+    lines = [f"📋 {equipment.name} — {quantity} unit(s) needed:"]
+    for i, (slot, parsed_slot) in enumerate(zip(slots, parsed)):
+        if parsed_slot is None:
+            lines.append(f"⚠️ Invalid slot: {slot}")
             continue
+        start_dt, end_dt = parsed_slot
+        free = equipment.total_quantity - booked.get(i, 0)
+        icon = "✅" if free >= quantity else "❌"
+        lines.append(
+            f"{icon} {_fmt_date(start_dt)}, {_fmt_time(start_dt)}–{_fmt_time(end_dt)} "
+            f"({max(free, 0)}/{equipment.total_quantity} units free)"
+        )
+    return "\n".join(lines)
+
+
+def _booked_in_slot(
+    session, equipment_id: int, start_dt: datetime, end_dt: datetime,
+) -> tuple[int, Optional[datetime]]:
+    """
+    Return (units booked, latest end time) over active bookings of the
+    equipment that overlap the slot, computed in one aggregate query.
+    """
+
+    booked, last_end = session.execute(
+        _BOOKED_IN_SLOT_STMT,
+        {"eq_id": equipment_id, "slot_start": start_dt, "slot_end": end_dt},
+    ).one()
+    return booked, last_end
+
+
+def _generate_booking_id(session) -> str:
+    """
+    Generate the next booking ID in the sequence B001, B002, ...
 
-    return f"B{max_num + 1:03d}"
+    Draws the number from the booking_seq database sequence: one round
+    trip regardless of table size, and concurrent bookings never get the
+    same ID.  Numbers taken by rolled-back bookings are skipped.
+    """
+
+    return f"B{session.execute(_NEXT_BOOKING_NUMBER_STMT).scalar_one():03d}"
 
 
 def make_booking(
@@ -189,8 +598,9 @@ def make_booking(
     """
     Create a booking for the specified equipment and time slot.
 
-    Performs a conflict check, uses a DB transaction for all writes, and
-    returns a human-readable confirmation or error message.
+    Performs a conflict check under a row lock on the equipment, uses a DB
+    transaction for all writes, and returns a human-readable confirmation or
+    error message.
     """
 
     try:
@@ -206,17 +616,17 @@ def make_booking(
 
     with get_session() as session:
         try:
-            # Resolve equipment by case-insensitive name.
-            eq_stmt = select(Equipment).where(
-                func.lower(Equipment.name) == equipment_name.lower()
-            )
-            equipment = session.execute(eq_stmt).scalar_one_or_none()
+            equipment = _find_equipment(equipment_name)
             if not equipment:
                 return (
                     f"Equipment '{equipment_name}' not found. "
                     "Use list_equipment to see available options."
                 )
 
+            # Lock the equipment row so concurrent bookings of the same
+            # equipment check and insert one at a time.
+            session.execute(_LOCK_EQUIPMENT_STMT, {"eq_id": equipment.id})
+
             if quantity > equipment.total_quantity:
                 return (
                     f"❌ Only {equipment.total_quantity} unit(s) of "
@@ -224,15 +634,7 @@ def make_booking(
                 )
 
             # Overlap conflict check — sum quantities of all overlapping bookings.
-            conflict_stmt = (
-                select(Booking)
-                .where(Booking.equipment_id == equipment.id)
-                .where(Booking.status == "active")
-                .where(Booking.start_time < end_dt)
-                .where(Booking.end_time > start_dt)
-            )
-            conflicts: List[Booking] = list(session.execute(conflict_stmt).scalars())
-            total_booked_in_slot = sum(b.quantity for b in conflicts)
+            total_booked_in_slot, _ = _booked_in_slot(session, equipment.id, start_dt, end_dt)
             available_in_slot = equipment.total_quantity - total_booked_in_slot
 
             if quantity > available_in_slot:
@@ -255,8 +657,11 @@ def make_booking(
                 status="active",
             )
             session.add(booking)
-            equipment.available_quantity -= quantity
+            # Decrement in SQL, not on the loaded object, so concurrent
+            # writes to the same row are not lost.
+            session.execute(_ADJUST_AVAILABLE_STMT, {"eq_id": equipment.id, "delta": -quantity})
             session.commit()
+            _record_write()
 
             eq_name = equipment.name  # capture before session closes
 
@@ -286,30 +691,23 @@ def get_bookings(club_name: str) -> str:
     Uses a case-insensitive partial match on club_name.
     """
 
-    with get_session() as session:
+    with read_only_session() as session:
         try:
-            stmt = (
-                select(Booking)
-                .options(selectinload(Booking.equipment))
-                .join(Equipment)
-                .where(Booking.club_name.ilike(f"%{club_name}%"))
-                .where(Booking.status == "active")
-                .order_by(Booking.start_time.asc())
+            bookings = _stream_rows(
+                session, _CLUB_ACTIVE_STMT, {"club_pattern": f"%{club_name}%"},
             )
-            bookings: List[Booking] = list(session.execute(stmt).scalars())
 
-            if not bookings:
+            if bookings is None:
                 return f"No active bookings found for {club_name}."
 
-            lines = [f"📋 Active Bookings for {club_name}:", "─────────────────────"]
-            for b in bookings:
-                date_label = b.start_time.strftime("%-d %b")
-                lines.append(
-                    f"{b.equipment.name} x{b.quantity} | {date_label} | "
-                    f"{_fmt_time(b.start_time)}–{_fmt_time(b.end_time)} | {b.booked_by}"
-                )
-            lines.append("─────────────────────")
-            return "\n".join(lines)
+            return "\n".join(chain(
+                (f"📋 Active Bookings for {club_name}:", "─────────────────────"),
+                (
+                    f"{b.equipment_name} x{b.quantity} | {_fmt_row_slot(b)} | {b.booked_by}"
+                    for b in bookings
+                ),
+                ("─────────────────────",),
+            ))
 
         except Exception as exc:
             return f"Failed to fetch bookings due to an internal error: {exc}"
@@ -322,66 +720,79 @@ def get_booking_history(club_name: str) -> str:
     Uses a case-insensitive partial match on club_name.
     """
 
-    with get_session() as session:
+    with read_only_session() as session:
         try:
-            stmt = (
-                select(Booking)
-                .options(selectinload(Booking.equipment))
-                .join(Equipment)
-                .where(Booking.club_name.ilike(f"%{club_name}%"))
-                .where(Booking.status.in_(["returned", "cancelled"]))
-                .order_by(Booking.start_time.desc())
+            bookings = _stream_rows(
+                session, _CLUB_HISTORY_STMT, {"club_pattern": f"%{club_name}%"},
             )
-            bookings: List[Booking] = list(session.execute(stmt).scalars())
 
-            if not bookings:
+            if bookings is None:
                 return f"No past bookings found for {club_name}."
 
-            lines = [f"📜 Booking History for {club_name}:", "─────────────────────"]
-            for b in bookings:
-                date_label = b.start_time.strftime("%-d %b")
-                status_icon = "🔄" if b.status == "returned" else "❌"
-                lines.append(
-                    f"{status_icon} {b.equipment.name} x{b.quantity} | {date_label} | "
-                    f"{_fmt_time(b.start_time)}–{_fmt_time(b.end_time)} | "
-                    f"{b.booked_by} | {b.status}"
-                )
-            lines.append("─────────────────────")
-            return "\n".join(lines)
+            return "\n".join(chain(
+                (f"📜 Booking History for {club_name}:", "─────────────────────"),
+                (
+                    f"{'🔄' if b.status == 'returned' else '❌'} {b.equipment_name} "
+                    f"x{b.quantity} | {_fmt_row_slot(b)} | {b.booked_by} | {b.status}"
+                    for b in bookings
+                ),
+                ("─────────────────────",),
+            ))
 
         except Exception as exc:
             return f"Failed to fetch booking history due to an internal error: {exc}"
 
 
+def _close_booking(session, booking_id: str, status: str) -> Optional[tuple[int, str]]:
+    """
+    Move an active booking to `status` and give its units back.
+
+    Both steps are single UPDATE statements: the booking update only
+    matches while the booking is still active, so two concurrent
+    cancellations cannot both release the units.  Returns
+    (quantity, equipment name), or None if no active booking matched.
+    The caller commits.
+    """
+
+    released = session.execute(
+        _CLOSE_BOOKING_STMT, {"b_id": booking_id, "new_status": status},
+    ).one_or_none()
+    if released is None:
+        return None
+
+    eq_name = session.execute(
+        _ADJUST_AVAILABLE_STMT,
+        {"eq_id": released.equipment_id, "delta": released.quantity},
+    ).scalar_one_or_none()
+    return released.quantity, eq_name or "the equipment"
+
+
+def _booking_status(session, booking_id: str) -> Optional[str]:
+    """Return the status of a booking, or None if it does not exist."""
+
+    return session.execute(_BOOKING_STATUS_STMT, {"b_id": booking_id}).scalar_one_or_none()
+
+
 def cancel_booking(booking_id: str) -> str:
     """
-    Cancel an active booking and release one unit of the associated equipment.
+    Cancel an active booking and release its units of the associated equipment.
     """
 
     with get_session() as session:
         try:
-            stmt = select(Booking).where(
-                Booking.booking_id == booking_id.strip()
-            )
-            booking = session.execute(stmt).scalar_one_or_none()
-            if not booking:
-                return f"Booking {booking_id} not found. Please provide the exact Booking ID (e.g. B006)."
-
-            if booking.status != "active":
+            closed = _close_booking(session, booking_id.strip(), "cancelled")
+            if closed is None:
+                status = _booking_status(session, booking_id.strip())
+                if status is None:
+                    return f"Booking {booking_id} not found. Please provide the exact Booking ID (e.g. B006)."
                 return (
-                    f"Booking {booking_id} is already {booking.status} "
+                    f"Booking {booking_id} is already {status} "
                     f"and cannot be cancelled."
                 )
 
-            eq_stmt = select(Equipment).where(Equipment.id == booking.equipment_id)
-            equipment = session.execute(eq_stmt).scalar_one_or_none()
-
-            booking.status = "cancelled"
-            if equipment:
-                equipment.available_quantity += booking.quantity
             session.commit()
-
-            eq_name = equipment.name if equipment else "the equipment"
+            _record_write()
+            quantity, eq_name = closed
 
         except Exception as exc:
             session.rollback()
@@ -389,7 +800,7 @@ def cancel_booking(booking_id: str) -> str:
 
     return (
         f"✅ Booking {booking_id} has been cancelled. "
-        f"{booking.quantity} unit(s) of {eq_name} released."
+        f"{quantity} unit(s) of {eq_name} released."
     )
 
 
@@ -400,25 +811,16 @@ def return_equipment(booking_id: str) -> str:
 
     with get_session() as session:
         try:
-            stmt = select(Booking).where(
-                Booking.booking_id == booking_id.strip()
-            )
-            booking = session.execute(stmt).scalar_one_or_none()
-            if not booking:
-                return f"Booking {booking_id} not found. Please provide the exact Booking ID (e.g. B006)."
+            closed = _close_booking(session, booking_id.strip(), "returned")
+            if closed is None:
+                status = _booking_status(session, booking_id.strip())
+                if status is None:
+                    return f"Booking {booking_id} not found. Please provide the exact Booking ID (e.g. B006)."
+                return f"Booking {booking_id} is already {status}."
 
-            if booking.status != "active":
-                return f"Booking {booking_id} is already {booking.status}."
-
-            eq_stmt = select(Equipment).where(Equipment.id == booking.equipment_id)
-            equipment = session.execute(eq_stmt).scalar_one_or_none()
-
-            booking.status = "returned"
-            if equipment:
-                equipment.available_quantity += booking.quantity
             session.commit()
-
-            eq_name = equipment.name if equipment else "the equipment"
+            _record_write()
+            quantity, eq_name = closed
 
         except Exception as exc:
             session.rollback()
@@ -427,7 +829,7 @@ def return_equipment(booking_id: str) -> str:
     return (
         f"✅ Equipment returned successfully. "
         f"Booking {booking_id} marked as returned. "
-        f"{booking.quantity} unit(s) of {eq_name} back in the pool."
+        f"{quantity} unit(s) of {eq_name} back in the pool."
     )
 
 
@@ -436,29 +838,22 @@ def get_active_bookings() -> str:
     Retrieve all currently active bookings across all clubs.
     """
 
-    with get_session() as session:
+    with read_only_session() as session:
         try:
-            stmt = (
-                select(Booking)
-                .options(selectinload(Booking.equipment))
-                .join(Equipment)
-                .where(Booking.status == "active")
-                .order_by(Booking.start_time.asc())
-            )
-            bookings: List[Booking] = list(session.execute(stmt).scalars())
+            bookings = _stream_rows(session, _ALL_ACTIVE_STMT)
 
-            if not bookings:
+            if bookings is None:
                 return "No active bookings at the moment."
 
-            lines = ["📋 All Active Bookings:", "─────────────────────"]
-            for b in bookings:
-                date_label = b.start_time.strftime("%-d %b")
-                lines.append(
-                    f"{b.equipment.name} x{b.quantity} | {b.club_name} | "
-                    f"{date_label} | {_fmt_time(b.start_time)}–{_fmt_time(b.end_time)} | {b.booked_by}"
-                )
-            lines.append("─────────────────────")
-            return "\n".join(lines)
+            return "\n".join(chain(
+                ("📋 All Active Bookings:", "─────────────────────"),
+                (
+                    f"{b.equipment_name} x{b.quantity} | {b.club_name} | "
+                    f"{_fmt_row_slot(b)} | {b.booked_by}"
+                    for b in bookings
+                ),
+                ("─────────────────────",),
+            ))
 
         except Exception as exc:
             return f"Failed to fetch active bookings due to an internal error: {exc}"
@@ -469,31 +864,23 @@ def get_all_booking_history() -> str:
     Retrieve past (returned/cancelled) bookings across all clubs.
     """
 
-    with get_session() as session:
+    with read_only_session() as session:
         try:
-            stmt = (
-                select(Booking)
-                .options(selectinload(Booking.equipment))
-                .join(Equipment)
-                .where(Booking.status.in_(["returned", "cancelled"]))
-                .order_by(Booking.start_time.desc())
-            )
-            bookings: List[Booking] = list(session.execute(stmt).scalars())
+            bookings = _stream_rows(session, _ALL_HISTORY_STMT)
 
-            if not bookings:
+            if bookings is None:
                 return "No past bookings found."
 
-            lines = ["📜 All Booking History:", "─────────────────────"]
-            for b in bookings:
-                date_label = b.start_time.strftime("%-d %b")
-                status_icon = "🔄" if b.status == "returned" else "❌"
-                lines.append(
-                    f"{status_icon} {b.equipment.name} x{b.quantity} | {b.club_name} | "
-                    f"{date_label} | {_fmt_time(b.start_time)}–{_fmt_time(b.end_time)} | "
+            return "\n".join(chain(
+                ("📜 All Booking History:", "─────────────────────"),
+                (
+                    f"{'🔄' if b.status == 'returned' else '❌'} {b.equipment_name} "
+                    f"x{b.quantity} | {b.club_name} | {_fmt_row_slot(b)} | "
                     f"{b.booked_by} | {b.status}"
-                )
-            lines.append("─────────────────────")
-            return "\n".join(lines)
+                    for b in bookings
+                ),
+                ("─────────────────────",),
+            ))
 
         except Exception as exc:
             return f"Failed to fetch all booking history due to an internal error: {exc}"
@@ -505,7 +892,7 @@ def get_all_booking_history() -> str:
 def lookup_user(username: str) -> dict | None:
     """Look up a user by username (case-insensitive). Returns info dict or None."""
 
-    with get_session() as session:
+    with read_only_session() as session:
         stmt = select(User).where(func.lower(User.username) == username.strip().lower())
         user = session.execute(stmt).scalar_one_or_none()
         if not user:
@@ -537,6 +924,7 @@ def add_user(username: str, club_name: str) -> str:
             )
             session.add(new_user)
             session.commit()
+            _record_write()
             return f"✅ User '{username.strip()}' added and assigned to {club_name.strip()}."
         except Exception as exc:
             session.rollback()
@@ -546,7 +934,7 @@ def add_user(username: str, club_name: str) -> str:
 def list_users() -> str:
     """List all users in the system. Admin only."""
 
-    with get_session() as session:
+    with read_only_session() as session:
         try:
             stmt = select(User).order_by(User.role, User.username)
             users = session.execute(stmt).scalars().all()
@@ -576,6 +964,7 @@ def remove_user(username: str) -> str:
                 return f"Cannot remove admin user '{user.username}'."
             session.delete(user)
             session.commit()
+            _record_write()
             return f"✅ User '{user.username}' has been removed."
         except Exception as exc:
             session.rollback()
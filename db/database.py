@@ -16,8 +16,18 @@ from sqlalchemy.orm import declarative_base, sessionmaker, Session
 import config
 
 
-# Create the SQLAlchemy engine using the configured PostgreSQL URL.
-engine = create_engine(config.DATABASE_URL, echo=False, future=True)
+# Create the SQLAlchemy engine using the configured PostgreSQL URL.  The
+# pool is sized for the web API and Telegram bot sharing one process; pre-ping
+# and recycling replace connections the server or a proxy has dropped.
+engine = create_engine(
+    config.DATABASE_URL,
+    echo=False,
+    future=True,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+)
 
 # Base class for all ORM models.
 Base = declarative_base()
@@ -46,3 +56,26 @@ def get_session() -> Iterator[Session]:
         yield session
     finally:
         session.close()
+
+
+# Engine view whose connections run their transactions READ ONLY.
+_read_only_engine = engine.execution_options(postgresql_readonly=True)
+
+
+@contextmanager
+def read_only_session() -> Iterator[Session]:
+    """
+    Context manager that yields a Session for read-only work.
+
+    Its transactions run READ ONLY, so Postgres can skip write bookkeeping
+    and an accidental write fails loudly.  Loaded objects expire on commit
+    and autoflush is off, so nothing lingers in the identity map beyond the
+    unit of work.  Like get_session(), it connects lazily on first use, so
+    connection errors surface inside the caller's error handling.
+    """
+
+    session = Session(bind=_read_only_engine, autoflush=False, expire_on_commit=True)
+    try:
+        yield session
+    finally:
+        session.close()
@@ -12,15 +12,24 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    Sequence,
     String,
     func,
+    literal_column,
+    text,
 )
 from sqlalchemy.orm import relationship
 
 from db.database import Base
 
 
+# Numeric part of booking IDs (B001, B002, ...).  Bound to the metadata so
+# create_all() creates it; init_db() moves it past any existing IDs.
+booking_seq = Sequence("booking_seq", metadata=Base.metadata)
+
+
 class Equipment(Base):
     """
     Equipment available for booking (e.g. projectors, microphones).
@@ -59,6 +68,27 @@ class Booking(Base):
     status = Column(String, nullable=False, default="active")  # active/returned/cancelled
     created_at = Column(DateTime, nullable=False, server_default=func.now(), default=datetime.utcnow)
 
+    __table_args__ = (
+        # Overlap checks filter on equipment, active status and the booked
+        # period: a partial GiST index over active bookings serves the
+        # range-overlap (&&) query; btree_gist lets equipment_id share it.
+        Index(
+            "ix_bookings_period",
+            "equipment_id",
+            func.tsrange(start_time, end_time, literal_column("'[)'")),
+            postgresql_using="gist",
+            postgresql_where=text("status = 'active'"),
+        ),
+        # Trigram index so the substring club match (ILIKE '%club%') used by
+        # the booking listings does not scan the whole table.
+        Index(
+            "ix_bookings_club_trgm",
+            "club_name",
+            postgresql_using="gin",
+            postgresql_ops={"club_name": "gin_trgm_ops"},
+        ),
+    )
+
 
 class User(Base):
     """
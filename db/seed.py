@@ -9,7 +9,8 @@ from __future__ import annotations
 
 from typing import List, Dict
 
-from sqlalchemy import func, select, text, inspect
+from sqlalchemy import func, select, text, inspect, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from db.database import Base, engine, get_session
 import config
@@ -53,6 +54,25 @@ def _add_missing_columns() -> None:
                 conn.execute(text(stmt))
 
 
+def _add_missing_indexes() -> None:
+    """
+    Create any indexes defined in the ORM models that are missing from the
+    live database.  Like columns, create_all() never adds indexes to tables
+    that already exist.
+    """
+
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table_name, table in Base.metadata.tables.items():
+            if not inspector.has_table(table_name):
+                continue
+
+            existing = {ix["name"] for ix in inspector.get_indexes(table_name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(bind=conn)
+
+
 SEED_EQUIPMENT: List[Dict[str, object]] = [
     {"name": "Projector", "total_quantity": 2, "condition": "good"},
     {"name": "Microphone", "total_quantity": 3, "condition": "good"},
@@ -65,6 +85,10 @@ SEED_EQUIPMENT: List[Dict[str, object]] = [
 ]
 
 
+# Postgres extensions required by the model indexes.
+_EXTENSIONS = ("btree_gist", "pg_trgm")
+
+
 def init_db() -> None:
     """
     Create all database tables based on ORM models.
@@ -73,8 +97,33 @@ def init_db() -> None:
     helper ensures a working schema for local development and testing.
     """
 
+    with engine.begin() as conn:
+        for extension in _EXTENSIONS:
+            conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+
     Base.metadata.create_all(bind=engine)
     _add_missing_columns()
+    _add_missing_indexes()
+    _sync_booking_sequence()
+
+
+def _sync_booking_sequence() -> None:
+    """
+    Point booking_seq just past the highest existing Bnnn booking ID.
+
+    Needed once for databases that predate the sequence; on later runs it
+    is a no-op in effect, since the sequence is already past the maximum.
+    """
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "SELECT setval('booking_seq', GREATEST("
+            "  (SELECT COALESCE(MAX(CAST(SUBSTRING(booking_id FROM 2) AS INTEGER)), 0) + 1"
+            "   FROM bookings WHERE booking_id ~ '^B[0-9]+$'),"
+            "  (SELECT CASE WHEN is_called THEN last_value + 1 ELSE last_value END"
+            "   FROM booking_seq)"
+            "), false)"
+        ))
 
 
 def seed_equipment() -> None:
@@ -87,19 +136,19 @@ def seed_equipment() -> None:
 
     with get_session() as session:
         try:
-            for item in SEED_EQUIPMENT:
-                stmt = select(Equipment).where(Equipment.name == item["name"])
-                existing = session.execute(stmt).scalar_one_or_none()
-                if existing:
-                    continue
-
-                equipment = Equipment(
-                    name=item["name"],
-                    total_quantity=item["total_quantity"],
-                    available_quantity=item["total_quantity"],
-                    condition=item["condition"],
-                )
-                session.add(equipment)
+            rows = [
+                {
+                    "name": item["name"],
+                    "total_quantity": item["total_quantity"],
+                    "available_quantity": item["total_quantity"],
+                    "condition": item["condition"],
+                }
+                for item in SEED_EQUIPMENT
+            ]
+            # One statement; the unique index on name skips existing rows.
+            session.execute(
+                pg_insert(Equipment).values(rows).on_conflict_do_nothing(index_elements=["name"])
+            )
 
             # If there are no active bookings, reset availability to total
             # so stale counts from dropped/cleared bookings don't persist.
@@ -107,9 +156,9 @@ def seed_equipment() -> None:
                 select(func.count()).select_from(Booking).where(Booking.status == "active")
             ).scalar()
             if active_count == 0:
-                all_equipment = list(session.execute(select(Equipment)).scalars())
-                for eq in all_equipment:
-                    eq.available_quantity = eq.total_quantity
+                session.execute(
+                    update(Equipment).values(available_quantity=Equipment.total_quantity)
+                )
 
             session.commit()
         except Exception:
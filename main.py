@@ -4,20 +4,30 @@ Main entry point for EquiBot.
 Startup sequence:
 1. Validate config (triggers EnvironmentError if keys are missing)
 2. Create all DB tables and seed equipment data
-3. Start FastAPI (uvicorn) in a background thread on port 8000
-4. Start Telegram bot (polling) in the main thread
+3. Run FastAPI (uvicorn) on port 8000 and the Telegram bot (polling) on
+   one asyncio event loop
    — if TELEGRAM_BOT_TOKEN is absent, only the web server runs
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
-import threading
+from typing import TYPE_CHECKING, Optional
 
 import uvicorn
 
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
+from core.booking_engine import refresh_equipment_cache
 from db.seed import init_db, seed_equipment, seed_admin_user
 
+if TYPE_CHECKING:
+    from telegram.ext import Application
+
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,13 +36,76 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def run_api() -> None:
+def _api_server() -> uvicorn.Server:
     """
-    Start the FastAPI application using Uvicorn in a background thread.
+    Build the Uvicorn server for the FastAPI application.
+
+    Served in-loop with Server.serve(), so it shares the event loop (and
+    the agent's OpenAI client) with the Telegram bot.
     """
 
     from api.main import app  # imported here to avoid circular imports at module level
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="warning")
+    # The httptools C parser cuts per-request overhead.  A single worker:
+    # the app object shares this process with the Telegram bot (see the
+    # README for a multi-worker API-only launch).
+    server_config = uvicorn.Config(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        log_level="warning",
+        http="httptools",
+        access_log=False,
+    )
+    return uvicorn.Server(server_config)
+
+
+async def _start_telegram() -> Optional[Application]:
+    """
+    Start the Telegram bot polling on the running loop.
+
+    Returns the running Application, or None if the bot is not configured
+    or fails to start — the web server keeps running either way.
+    """
+
+    import config as cfg
+
+    if not cfg.TELEGRAM_BOT_TOKEN:
+        print("⚠️  TELEGRAM_BOT_TOKEN not set — Telegram bot will not start.")
+        print("✅ EquiBot is ready! (Web UI only)")
+        return None
+
+    print("🤖 Telegram bot starting...")
+    try:
+        from bot.telegram_bot import build_telegram_app
+        telegram_app = build_telegram_app()
+        await telegram_app.initialize()
+        await telegram_app.start()
+        await telegram_app.updater.start_polling()
+    except Exception as exc:
+        print(f"❌ Telegram bot error: {exc}")
+        print("   The web UI is still running at http://localhost:8000")
+        return None
+
+    print("✅ EquiBot is ready!")
+    return telegram_app
+
+
+async def _serve() -> None:
+    """Run the web server and the Telegram bot until the server exits."""
+
+    server = _api_server()
+    print("🌐 Web UI running at http://localhost:8000/ui/index.html")
+    print("📡 API running at http://localhost:8000")
+
+    telegram_app = await _start_telegram()
+    try:
+        # Returns on Ctrl+C / SIGTERM, which uvicorn handles.
+        await server.serve()
+    finally:
+        if telegram_app is not None:
+            await telegram_app.updater.stop()
+            await telegram_app.stop()
+            await telegram_app.shutdown()
 
 
 def main() -> None:
@@ -42,9 +115,14 @@ def main() -> None:
 
     print("🚀 EquiBot starting up...")
 
+    # Faster event loop for the web server and the Telegram bot, when available.
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     # ── Step 1: validate config ──────────────────────────────────────────
     try:
-        import config  # noqa: F401 — triggers validation on import
+        import config  # triggers validation on import
+        config.OPENAI_API_KEY  # validated lazily; the agent always needs it here
     except EnvironmentError as exc:
         print(f"❌ Configuration error: {exc}")
         return
@@ -54,6 +132,7 @@ def main() -> None:
         init_db()
         print("📦 Database initialised")
         seed_equipment()
+        refresh_equipment_cache()
         print("🌱 Seed data loaded")
         seed_admin_user()
         print("🔐 Admin user seeded")
@@ -62,33 +141,8 @@ def main() -> None:
         print("   Check that PostgreSQL is running and DATABASE_URL is correct.")
         return
 
-    # ── Step 3: FastAPI in background thread ─────────────────────────────
-    api_thread = threading.Thread(target=run_api, daemon=True)
-    api_thread.start()
-    print("🌐 Web UI running at http://localhost:8000/ui/index.html")
-    print("📡 API running at http://localhost:8000")
-
-    # ── Step 4: Telegram bot ─────────────────────────────────────────────
-    import config as cfg
-
-    if not cfg.TELEGRAM_BOT_TOKEN:
-        print("⚠️  TELEGRAM_BOT_TOKEN not set — Telegram bot will not start.")
-        print("✅ EquiBot is ready! (Web UI only)")
-        # Keep main thread alive so the daemon API thread keeps running.
-        api_thread.join()
-        return
-
-    print("🤖 Telegram bot starting...")
-    print("✅ EquiBot is ready!")
-
-    try:
-        from bot.telegram_bot import build_telegram_app
-        telegram_app = build_telegram_app()
-        telegram_app.run_polling()
-    except Exception as exc:
-        print(f"❌ Telegram bot error: {exc}")
-        print("   The web UI is still running at http://localhost:8000")
-        api_thread.join()
+    # ── Step 3: FastAPI + Telegram bot on one event loop ────────────────
+    asyncio.run(_serve())
 
 
 if __name__ == "__main__":